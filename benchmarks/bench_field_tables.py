@@ -0,0 +1,47 @@
+"""Time FRU.parse_area and FRU.build_area on an image with every custom slot used.
+
+Compare with another copy of the utility:
+    git show HEAD~1:fruid_util.py > /tmp/old_fruid_util.py
+    python3 benchmarks/bench_field_tables.py --util /tmp/old_fruid_util.py
+"""
+
+import argparse
+import timeit
+from pathlib import Path
+
+from common import LIB_PATH, load_fruid_util, make_sample_image
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--util", type=Path, default=LIB_PATH)
+    parser.add_argument("-n", "--number", type=int, default=5000)
+    args = parser.parse_args()
+
+    util = load_fruid_util(args.util)
+    image = make_sample_image(load_fruid_util(), custom_fields=util.CustomerDataMax)
+    fru = util.FRU(raw_data=bytearray(image))
+    fru.parse_bin(None)
+
+    print(f"utility:    {args.util}")
+    print(f"image size: {len(image)} bytes")
+    for area, index in (("chassis", 2), ("board", 3), ("product", 4)):
+        offset = fru.common_header[index] * 8
+        parse = min(
+            timeit.repeat(
+                lambda: fru.parse_area(area, offset, False),
+                number=args.number,
+                repeat=5,
+            )
+        )
+        build = min(
+            timeit.repeat(lambda: fru.build_area(area), number=args.number, repeat=5)
+        )
+        print(
+            f"{area:8} parse_area {parse / args.number * 1e6:6.1f} us   "
+            f"build_area {build / args.number * 1e6:6.1f} us"
+        )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,134 @@
+"""Time fruid-gen script generation over a synthetic many-board sheet.
+
+Generates the M1, M3 and ICT content of every board twice: with the former
+per-call re.search classification helpers, and with fruid-gen's cached
+classify_cell(). Both must produce the same scripts.
+"""
+
+import argparse
+import re
+import time
+
+from common import load_fruid_gen
+
+# The classification helpers as they were before classify_cell()
+
+
+def legacy_is_empty_field(value):
+    if not isinstance(value, str):
+        return False
+    empty_keywords = [r"\[\s*empty.*?\]"]
+    return any(re.search(keyword, value, re.IGNORECASE) for keyword in empty_keywords)
+
+
+def legacy_is_non_displayable_ascii(value):
+    if not isinstance(value, str):
+        return False
+    return any(ord(char) < 32 or ord(char) > 126 for char in value)
+
+
+def legacy_is_dynamic_content(value, stage):
+    if not isinstance(value, str):
+        return False
+    stage_keywords = {
+        "M1": r"m1[\s_\n]*(odm[\s_\n]*)?(define|program)",
+        "M3": r"m3[\s_\n]*(odm[\s_\n]*)?(define|program)",
+    }
+    for key, keyword in stage_keywords.items():
+        if re.search(keyword, value, re.IGNORECASE):
+            if key != stage:
+                return None
+            return True
+    dynamic_keywords = [
+        r"odm[\s_\n]*define",
+        r"odm[\s_\n]*program",
+        r"\[.*?\]",
+        r"batch[\s_\n]*id",
+    ]
+    return any(re.search(keyword, value, re.IGNORECASE) for keyword in dynamic_keywords)
+
+
+def legacy_determine_field_length(gen, field, value):
+    if isinstance(value, str):
+        pound_match = re.search(r"\[#(\d+)\]", value)
+        if pound_match:
+            return int(pound_match.group(1))
+    if field in gen.FIELD_CONFIG and len(gen.FIELD_CONFIG[field]) > 2:
+        default_length = gen.FIELD_CONFIG[field][2]
+        if default_length is not None:
+            return default_length
+    return 0
+
+
+def make_boards(gen, count):
+    # A mix of fixed, per-stage, sized and empty cells, largely repeated
+    # across boards as in a real platform sheet
+    samples = [
+        "Vendor Inc.",
+        "M1 ODM define",
+        "M3 ODM program",
+        "[ODM define][#15]",
+        "[Empty]",
+        "Batch ID",
+        "FRU Ver 0.01",
+        "  spaced   value  ",
+    ]
+    boards = []
+    for i in range(count):
+        fru_fields = {"Board Part Number": f"BPN-{i:05d}", "Chassis Type": 23}
+        for n, field in enumerate(gen.FIELD_CONFIG):
+            if field != "Board Part Number":
+                fru_fields[field] = samples[(i + n) % len(samples)]
+        boards.append(fru_fields)
+    return boards
+
+
+def generate_all(gen, boards):
+    return [
+        gen.generate_fru_script_content(fields, stage, fields["Board Part Number"])
+        for fields in boards
+        for stage in ("M1", "M3", "ICT")
+    ]
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--boards", type=int, default=2000)
+    args = parser.parse_args()
+
+    gen = load_fruid_gen()
+    boards = make_boards(gen, args.boards)
+    print(f"sheet: {args.boards} boards x {len(gen.FIELD_CONFIG)} fields")
+
+    current = (
+        gen.is_empty_field,
+        gen.is_non_displayable_ascii,
+        gen.is_dynamic_content,
+        gen.determine_field_length,
+    )
+    gen.is_empty_field = legacy_is_empty_field
+    gen.is_non_displayable_ascii = legacy_is_non_displayable_ascii
+    gen.is_dynamic_content = legacy_is_dynamic_content
+    gen.determine_field_length = lambda f, v: legacy_determine_field_length(gen, f, v)
+    start = time.perf_counter()
+    legacy = generate_all(gen, boards)
+    legacy_s = time.perf_counter() - start
+
+    (
+        gen.is_empty_field,
+        gen.is_non_displayable_ascii,
+        gen.is_dynamic_content,
+        gen.determine_field_length,
+    ) = current
+    gen.classify_cell.cache_clear()
+    start = time.perf_counter()
+    scripts = generate_all(gen, boards)
+    cached_s = time.perf_counter() - start
+
+    assert scripts == legacy, "classify_cell changed the generated scripts"
+    print(f"re.search per call:  {legacy_s * 1e3:8.1f} ms")
+    print(f"classify_cell:       {cached_s * 1e3:8.1f} ms ({legacy_s / cached_s:.1f}x)")
+
+
+if __name__ == "__main__":
+    main()
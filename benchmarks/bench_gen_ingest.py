@@ -0,0 +1,89 @@
+"""Time reading board columns from a large synthetic fruid-gen workbook.
+
+Compares the former ingestion (full load_workbook, then one cell lookup per
+row and board column) with fruid-gen's read_fru_columns() single pass.
+"""
+
+import argparse
+import os
+import tempfile
+import time
+
+import openpyxl
+
+from common import load_fruid_gen
+
+
+def make_workbook(path, boards, notes, hidden):
+    gen = load_fruid_gen()
+    wb = openpyxl.Workbook()
+    sheet = wb.active
+    sheet.append(["Field"] + [f"Board {i}" for i in range(boards)])
+    for field, (option, _, length) in gen.FIELD_CONFIG.items():
+        row = [field]
+        for i in range(boards):
+            if option == "BSN":
+                row.append("[M1 ODM define][#15]")
+            elif option == "BPN":
+                row.append(f"BPN-{i:05d}")
+            else:
+                row.append(f"{option} value {i}")
+        sheet.append(row)
+    for n in range(notes):
+        sheet.append([f"Note {n}"] + [f"remark {n}/{i}" for i in range(boards)])
+    for i in range(0, boards, hidden or boards + 1):
+        letter = openpyxl.utils.get_column_letter(i + 2)
+        sheet.column_dimensions[letter].hidden = True
+    wb.save(path)
+
+
+def legacy_read_columns(excel_file):
+    wb = openpyxl.load_workbook(excel_file)
+    sheet = wb.active
+    columns = [
+        cell.column_letter
+        for cell in sheet[1][1:]
+        if cell.value and not sheet.column_dimensions[cell.column_letter].hidden
+    ]
+    result = {}
+    for col in columns:
+        fru_fields = {}
+        for row in range(1, sheet.max_row + 1):
+            field_name = sheet[f"A{row}"].value
+            field_value = sheet[f"{col}{row}"].value
+            if field_name and field_value:
+                fru_fields[field_name] = field_value
+        result[col] = fru_fields
+    return result
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--boards", type=int, default=200)
+    parser.add_argument("--notes", type=int, default=1000, help="extra rows")
+    parser.add_argument("--hidden", type=int, default=10, help="hide every Nth board")
+    args = parser.parse_args()
+
+    gen = load_fruid_gen()
+    fd, path = tempfile.mkstemp(suffix=".xlsx")
+    os.close(fd)
+    try:
+        make_workbook(path, args.boards, args.notes, args.hidden)
+        print(f"workbook: {args.boards} boards x {len(gen.FIELD_CONFIG) + args.notes + 1} rows")
+
+        start = time.perf_counter()
+        legacy = legacy_read_columns(path)
+        legacy_s = time.perf_counter() - start
+        start = time.perf_counter()
+        columns = gen.read_fru_columns(path)
+        stream_s = time.perf_counter() - start
+
+        assert columns == legacy, "read_fru_columns differs from the full load"
+        print(f"full load + cell lookups: {legacy_s:7.2f} s")
+        print(f"read_fru_columns:         {stream_s:7.2f} s ({legacy_s / stream_s:.1f}x)")
+    finally:
+        os.unlink(path)
+
+
+if __name__ == "__main__":
+    main()
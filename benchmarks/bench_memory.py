@@ -0,0 +1,61 @@
+"""Compare the memory held by parsed FRU objects and FRUStore records."""
+
+import argparse
+import gc
+import tracemalloc
+
+from common import load_fruid_util, make_sample_image
+
+
+def measure(build):
+    gc.collect()
+    tracemalloc.start()
+    before, _ = tracemalloc.get_traced_memory()
+    result = build()
+    gc.collect()
+    after, _ = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return result, after - before
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("-n", "--count", type=int, default=100000)
+    args = parser.parse_args()
+
+    util = load_fruid_util()
+    base = make_sample_image(util)
+    # Give every image its own serial so that no strings are shared
+    images = []
+    for i in range(args.count):
+        fru = util.FRU(raw_data=bytearray(base))
+        fru.parse_bin(None)
+        fru.modify_field("BSN", f"BSN{i:012d}")
+        fru.update_binary()
+        images.append(bytes(fru.raw_data))
+
+    def build_frus():
+        frus = []
+        for image in images:
+            fru = util.FRU(raw_data=bytearray(image))
+            fru.parse_bin(None)
+            frus.append(fru)
+        return frus
+
+    def build_store():
+        store = util.FRUStore()
+        for image in images:
+            store.add(image)
+        return store
+
+    frus, fru_bytes = measure(build_frus)
+    store, store_bytes = measure(build_store)
+    assert store[-1]["BSN"] == frus[-1].board_info["Board Serial"]
+
+    print(f"records:  {args.count} x {len(base)}-byte images")
+    print(f"FRU:      {fru_bytes / 2**20:8.1f} MiB ({fru_bytes / args.count:.0f} B/record)")
+    print(f"FRUStore: {store_bytes / 2**20:8.1f} MiB ({store_bytes / args.count:.0f} B/record)")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,56 @@
+"""Measure time and memory churn of FRU.parse_bin on an in-memory image.
+
+Run against another copy of the utility to compare before/after:
+    git show HEAD~1:fruid_util.py > /tmp/old_fruid_util.py
+    python3 benchmarks/bench_parse.py --util /tmp/old_fruid_util.py
+"""
+
+import argparse
+import timeit
+import tracemalloc
+from pathlib import Path
+
+from common import LIB_PATH, load_fruid_util, make_sample_image
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--util", type=Path, default=LIB_PATH)
+    parser.add_argument("-n", "--number", type=int, default=5000)
+    args = parser.parse_args()
+
+    util = load_fruid_util(args.util)
+    image = make_sample_image(load_fruid_util(), custom_fields=20)
+
+    def parse():
+        fru = util.FRU(raw_data=bytearray(image))
+        fru.parse_bin(None)
+
+    parse()
+    tracemalloc.start()
+    tracemalloc.reset_peak()
+    before, _ = tracemalloc.get_traced_memory()
+    parse()
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+
+    seconds = min(timeit.repeat(parse, number=args.number, repeat=5))
+
+    view_seconds = None
+    if hasattr(util, "FRUView"):
+
+        def get_serial():
+            util.FRUView(image).get("BSN")
+
+        view_seconds = min(timeit.repeat(get_serial, number=args.number, repeat=5))
+
+    print(f"utility:          {args.util}")
+    print(f"image size:       {len(image)} bytes")
+    print(f"peak churn/parse: {peak - before} bytes")
+    print(f"time/parse:       {seconds / args.number * 1e6:.1f} us")
+    if view_seconds is not None:
+        print(f"time/FRUView BSN: {view_seconds / args.number * 1e6:.1f} us")
+
+
+if __name__ == "__main__":
+    main()
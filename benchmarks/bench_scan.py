@@ -0,0 +1,52 @@
+"""Time scan_corpus over a packed corpus with and without NumPy."""
+
+import argparse
+import os
+import random
+import tempfile
+import timeit
+from pathlib import Path
+
+from common import load_fruid_util, make_sample_image
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("-n", "--count", type=int, default=100000)
+    parser.add_argument("--slot-size", type=int, default=1024)
+    args = parser.parse_args()
+
+    util = load_fruid_util()
+    image = make_sample_image(util)
+    slot = bytes(image) + b"\xff" * (args.slot_size - len(image))
+    # Corrupt one image in a hundred so that the reporting path is exercised
+    rng = random.Random(0)
+    corrupt = set(rng.sample(range(args.count), args.count // 100))
+    bad_slot = bytearray(slot)
+    bad_slot[len(image) - 2] ^= 0x01
+
+    fd, name = tempfile.mkstemp(suffix=".bin")
+    try:
+        with os.fdopen(fd, "wb") as f:
+            for i in range(args.count):
+                f.write(bad_slot if i in corrupt else slot)
+        path = Path(name)
+
+        print(f"corpus: {args.count} x {args.slot_size}-byte slots")
+        for label, use_numpy in (("python", False), ("numpy", True)):
+            found = list(util.scan_corpus(path, args.slot_size, use_numpy))
+            assert {r["Index"] for r in found} == corrupt
+            best = min(
+                timeit.repeat(
+                    lambda: list(util.scan_corpus(path, args.slot_size, use_numpy)),
+                    number=1,
+                    repeat=5,
+                )
+            )
+            print(f"{label:7s} {best * 1e3:8.1f} ms ({args.count / best:,.0f} images/s)")
+    finally:
+        os.unlink(name)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,51 @@
+"""Time stamping unit images from one base image.
+
+Compares the per-unit FRU.modify_field + rebuild_fru_binary loop with
+FRUStamper, which patches BSN/PSN/PAT and the area checksums in a copy of
+the base image.
+"""
+
+import argparse
+import time
+
+from common import load_fruid_util, make_sample_image
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("-n", "--count", type=int, default=10000)
+    args = parser.parse_args()
+
+    util = load_fruid_util()
+    base = make_sample_image(util)
+    units = list(
+        util.stamp_units(
+            {"BSN": "BSN{n:012d}", "PSN": "PSN{n:012d}", "PAT": "ASSET-{n:04d}"},
+            args.count,
+        )
+    )
+
+    start = time.perf_counter()
+    rebuilt = []
+    for unit in units:
+        fru = util.FRU(raw_data=bytearray(base))
+        fru.parse_bin(None)
+        for name, value in unit.items():
+            fru.modify_field(name, value)
+        fru.rebuild_fru_binary()
+        rebuilt.append(bytes(fru.raw_data))
+    rebuild_s = time.perf_counter() - start
+
+    start = time.perf_counter()
+    stamper = util.FRUStamper(base, ["BSN", "PSN", "PAT"])
+    stamped = [bytes(stamper.stamp(unit)) for unit in units]
+    stamp_s = time.perf_counter() - start
+
+    assert stamped == rebuilt, "stamped images differ from rebuilt ones"
+    print(f"units: {args.count} x {len(base)}-byte images")
+    print(f"modify + rebuild: {rebuild_s * 1e3:8.1f} ms")
+    print(f"FRUStamper:       {stamp_s * 1e3:8.1f} ms ({rebuild_s / stamp_s:.0f}x)")
+
+
+if __name__ == "__main__":
+    main()
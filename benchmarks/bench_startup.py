@@ -0,0 +1,87 @@
+"""Report start-up cost of fruid-util.py for the common read/query invocations.
+
+For each command line, prints the median wall-clock time over several runs
+(next to a bare interpreter start) and the slowest imports reported by
+-X importtime. With --max-ms, exits non-zero if a median exceeds the budget,
+so that start-up regressions can be caught.
+"""
+
+import argparse
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+from common import UTIL_PATH, load_fruid_util, make_sample_image
+
+
+def run(cmd):
+    start = time.perf_counter()
+    subprocess.run(cmd, check=True, stdout=subprocess.DEVNULL)
+    return time.perf_counter() - start
+
+
+def median_ms(cmd, runs):
+    return statistics.median(run(cmd) for _ in range(runs)) * 1000
+
+
+def top_imports(cmd, count):
+    proc = subprocess.run(
+        [sys.executable, "-X", "importtime"] + cmd[1:],
+        check=True,
+        stdout=subprocess.DEVNULL,
+        stderr=subprocess.PIPE,
+        text=True,
+    )
+    imports = []
+    for line in proc.stderr.splitlines():
+        if not line.startswith("import time:") or "cumulative" in line:
+            continue
+        _, cumulative, name = line[len("import time:") :].split("|")
+        if not name.startswith("  "):  # Top-level imports only
+            imports.append((int(cumulative), name.strip()))
+    imports.sort(reverse=True)
+    return sum(us for us, _ in imports), imports[:count]
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--util", type=Path, default=UTIL_PATH)
+    parser.add_argument("-r", "--runs", type=int, default=20)
+    parser.add_argument("-t", "--top", type=int, default=8)
+    parser.add_argument("--max-ms", type=float, help="fail if a median exceeds this")
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        sample = Path(tmp) / "fru.bin"
+        sample.write_bytes(make_sample_image(load_fruid_util()))
+
+        python_ms = median_ms([sys.executable, "-c", "pass"], args.runs)
+        print(f"python -c pass: {python_ms:.1f} ms")
+        if sys.flags.dont_write_bytecode:
+            print("PYTHONDONTWRITEBYTECODE is set: fruid_util.py is compiled every run")
+
+        failed = False
+        for extra in ([], ["-g", "BSN,PSN"]):
+            cmd = [sys.executable, str(args.util), str(sample)] + extra
+            print(f"\nfruid-util.py fru.bin {' '.join(extra)}".rstrip())
+            try:
+                ms = median_ms(cmd, args.runs)
+            except subprocess.CalledProcessError:
+                print("  not supported by this version")
+                continue
+            total_us, imports = top_imports(cmd, args.top)
+            print(f"  median {ms:.1f} ms, imports {total_us / 1000:.1f} ms")
+            for us, name in imports:
+                print(f"  {us / 1000:6.1f} ms  {name}")
+            if args.max_ms is not None and ms > args.max_ms:
+                print(f"  exceeds budget of {args.max_ms:.1f} ms")
+                failed = True
+
+    return 1 if failed else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
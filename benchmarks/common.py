@@ -0,0 +1,59 @@
+"""Shared helpers for the fruid-util benchmarks."""
+
+import importlib.util
+import sys
+from pathlib import Path
+
+UTIL_PATH = Path(__file__).resolve().parent.parent / "fruid-util.py"
+LIB_PATH = UTIL_PATH.with_name("fruid_util.py")
+GEN_PATH = UTIL_PATH.with_name("fruid-gen.py")
+
+
+def load_fruid_util(path=LIB_PATH):
+    """Import fruid_util.py, or a copy of it from another revision (which
+    need not have a valid module name), as ``fruid_util``."""
+    spec = importlib.util.spec_from_file_location("fruid_util", str(path))
+    module = importlib.util.module_from_spec(spec)
+    sys.modules["fruid_util"] = module
+    spec.loader.exec_module(module)
+    return module
+
+
+def load_fruid_gen(path=GEN_PATH):
+    """Import fruid-gen.py (needs openpyxl) as ``fruid_gen``."""
+    spec = importlib.util.spec_from_file_location("fruid_gen", str(path))
+    module = importlib.util.module_from_spec(spec)
+    sys.modules["fruid_gen"] = module
+    spec.loader.exec_module(module)
+    return module
+
+
+def make_sample_image(util, custom_fields=6):
+    """Build a representative FRU image with all three info areas populated."""
+    fru = util.FRU()
+    fru.common_header = [0x01, 0x00, 0x00, 0x00, 0x00, 0x00, 0x00, 0x00]
+    values = {
+        "CPN": "CHASSIS-PN-0001",
+        "CSN": "CHASSIS-SN-0001",
+        "BM": "Manufacturer",
+        "BP": "Example Board",
+        "BSN": "BSN000000000001",
+        "BPN": "BPN-0001",
+        "BFI": "FRU v0.01",
+        "PM": "Manufacturer",
+        "PN": "Example Product",
+        "PPN": "PPN-0001",
+        "PV": "A01",
+        "PSN": "PSN000000000001",
+        "PAT": "ASSET-0001",
+        "PFI": "FRU v0.01",
+    }
+    for prefix in ("CCD", "BCD", "PCD"):
+        for i in range(1, custom_fields + 1):
+            values[f"{prefix}{i}"] = f"{prefix} custom value {i}"
+    for name, value in values.items():
+        fru.modify_field(name, value)
+    fru.modify_field("BMD", "2025-01-01 00:00:00")
+    if not fru.rebuild_fru_binary():
+        raise RuntimeError("failed to build sample image")
+    return bytes(fru.raw_data)
@@ -1,16 +1,29 @@
 import argparse
+import hashlib
+import importlib.util
+import json
 import openpyxl
 import os
+import posixpath
 import re
 import shutil
-import subprocess
 import sys
-from collections import defaultdict
+import zipfile
+from collections import defaultdict, namedtuple
+from concurrent.futures import ProcessPoolExecutor
 from datetime import datetime
+from functools import lru_cache
+from itertools import chain
 from pathlib import Path
+from xml.etree import ElementTree
+from xml.etree.ElementTree import iterparse
+from openpyxl.utils import get_column_letter
 
 __version__ = "v2025.19.0"
 
+# Records the inputs of the last build, see generate_fru_scripts()
+BUILD_MANIFEST = ".fruid-gen-manifest.json"
+
 # Set your platform name here
 PLATFORM_NAME = "PlatformName"
 
@@ -48,45 +61,58 @@ FIELD_CONFIG = {
 }
 
 
-def is_empty_field(value):
+# Cell classification patterns, compiled once. The M1 stage keyword is
+# checked before the M3 one, as a cell naming both belongs to M1.
+EMPTY_PATTERN = re.compile(r"\[\s*empty.*?\]", re.IGNORECASE)
+STAGE_PATTERNS = {
+    "M1": re.compile(r"m1[\s_\n]*(odm[\s_\n]*)?(define|program)", re.IGNORECASE),
+    "M3": re.compile(r"m3[\s_\n]*(odm[\s_\n]*)?(define|program)", re.IGNORECASE),
+}
+DYNAMIC_PATTERN = re.compile(
+    r"odm[\s_\n]*define|odm[\s_\n]*program|\[.*?\]|batch[\s_\n]*id", re.IGNORECASE
+)
+LENGTH_PATTERN = re.compile(r"\[#(\d+)\]")
+NON_DISPLAYABLE_PATTERN = re.compile(r"[^\x20-\x7e]")
+
+# empty: marked as empty data; stage: "M1"/"M3" if the cell names the stage
+# that programs it; dynamic: needs input data; length: [#N] length or None;
+# non_displayable: has characters outside printable ASCII
+CellClass = namedtuple("CellClass", "empty stage dynamic length non_displayable")
+NOT_TEXT = CellClass(False, None, False, None, False)
+
+
+@lru_cache(maxsize=None)
+def classify_cell(value):
+    """Classify a cell value once; results are shared by the M1, M3 and ICT
+    passes over every board."""
     if not isinstance(value, str):
-        return False
+        return NOT_TEXT
+
+    stage = next((s for s, p in STAGE_PATTERNS.items() if p.search(value)), None)
+    length = LENGTH_PATTERN.search(value)
+    return CellClass(
+        empty=EMPTY_PATTERN.search(value) is not None,
+        stage=stage,
+        dynamic=stage is not None or DYNAMIC_PATTERN.search(value) is not None,
+        length=int(length.group(1)) if length else None,
+        non_displayable=NON_DISPLAYABLE_PATTERN.search(value) is not None,
+    )
+
 
-    # Check for patterns indicating empty data
-    empty_keywords = [
-        r"\[\s*empty.*?\]",
-    ]
-    return any(re.search(keyword, value, re.IGNORECASE) for keyword in empty_keywords)
+def is_empty_field(value):
+    return classify_cell(value).empty
 
 
 def is_non_displayable_ascii(value):
-    if not isinstance(value, str):
-        return False
-    return any(ord(char) < 32 or ord(char) > 126 for char in value)
+    return classify_cell(value).non_displayable
 
 
 # To identify if the field needs input data
 def is_dynamic_content(value, stage):
-    if not isinstance(value, str):
-        return False
-
-    stage_keywords = {
-        "M1": r"m1[\s_\n]*(odm[\s_\n]*)?(define|program)",
-        "M3": r"m3[\s_\n]*(odm[\s_\n]*)?(define|program)",
-    }
-    for key, keyword in stage_keywords.items():
-        if re.search(keyword, value, re.IGNORECASE):
-            if key != stage:
-                return None
-            return True
-
-    dynamic_keywords = [
-        r"odm[\s_\n]*define",
-        r"odm[\s_\n]*program",
-        r"\[.*?\]",
-        r"batch[\s_\n]*id",
-    ]
-    return any(re.search(keyword, value, re.IGNORECASE) for keyword in dynamic_keywords)
+    cell = classify_cell(value)
+    if cell.stage is not None and cell.stage != stage:
+        return None
+    return cell.dynamic
 
 
 def strip_field_content(value):
@@ -163,11 +189,9 @@ Changed/Added:
 
 def determine_field_length(field, value):
     # Check for [#..] pattern in the value
-    if isinstance(value, str):
-        pound_match = re.search(r"\[#(\d+)\]", value)
-        if pound_match:
-            # Return the numeric value
-            return int(pound_match.group(1))
+    length = classify_cell(value).length
+    if length is not None:
+        return length
 
     if field in FIELD_CONFIG and len(FIELD_CONFIG[field]) > 2:
         default_length = FIELD_CONFIG[field][2]
@@ -177,29 +201,24 @@ def determine_field_length(field, value):
     return 0
 
 
-def generate_fru_script_content(fru_fields, script_type, board_pn):
+def collect_field_options(fru_fields, script_type, board_pn):
+    """Decide how each field is programmed for a stage ("M1", "M3" or "ICT").
+
+    Returns (option, kind, value) entries in FIELD_CONFIG order, where kind
+    is "value" (program value), "raw" (program hex bytes), "read" (prompt
+    for the value) or "empty" (clear the field).
+    """
     is_ict = False
     if script_type == "ICT":
         is_ict = True
         script_type = "M1"
 
-    xlsx_line = f'XLSX="${{BIN%.*}}.xlsx"\n' if is_ict else ""
-    script_content = (
-        "#!/bin/sh\n\n"
-        'UTIL=$(dirname "$0")/../fruid-util.py\n'
-        "BIN=${1:-fru.bin}\n"
-        f"{xlsx_line}\n"
-    )
-
-    assignments = []
-    read_commands = []
-    python_commands = []
-
+    options = []
     if fru_fields.get("Chassis Type") and (
         not fru_fields.get("Chassis Part Number")
         or script_type not in FIELD_CONFIG["Chassis Part Number"][1]
     ):
-        python_commands.append(' --CPN ""')
+        options.append(("CPN", "empty", ""))
 
     for field, config in FIELD_CONFIG.items():
         option = config[0]
@@ -221,15 +240,12 @@ def generate_fru_script_content(fru_fields, script_type, board_pn):
                 if length > 0:
                     zeros = "0 " * length
                     zeros = zeros.strip()  # Remove trailing space
-                    assignments.append(f'{option}="{zeros}"')
-                    python_commands.append(f' --{option}-raw "${option}"')
+                    options.append((option, "raw", zeros))
                 else:
                     # Default to empty string if we can't determine length
-                    assignments.append(f'{option}=""')
-                    python_commands.append(f' --{option} "${option}"')
+                    options.append((option, "value", ""))
             else:
-                read_commands.append(f'read -p "{field}: " {option}')
-                python_commands.append(f' --{option} "${option}"')
+                options.append((option, "read", field))
             continue
 
         if is_non_displayable_ascii(value):
@@ -238,9 +254,39 @@ def generate_fru_script_content(fru_fields, script_type, board_pn):
             )
             continue
 
-        value = strip_field_content(value)
-        assignments.append(f'{option}="{value}"')
-        python_commands.append(f' --{option} "${option}"')
+        options.append((option, "value", strip_field_content(value)))
+
+    return options
+
+
+def generate_fru_script_content(fru_fields, script_type, board_pn):
+    is_ict = script_type == "ICT"
+    options = collect_field_options(fru_fields, script_type, board_pn)
+    if is_ict:
+        script_type = "M1"
+
+    xlsx_line = f'XLSX="${{BIN%.*}}.xlsx"\n' if is_ict else ""
+    script_content = (
+        "#!/bin/sh\n\n"
+        'UTIL=$(dirname "$0")/../fruid-util.py\n'
+        "BIN=${1:-fru.bin}\n"
+        f"{xlsx_line}\n"
+    )
+
+    assignments = []
+    read_commands = []
+    python_commands = []
+
+    for option, kind, value in options:
+        if kind == "empty":
+            python_commands.append(f' --{option} ""')
+        elif kind == "read":
+            read_commands.append(f'read -p "{value}: " {option}')
+            python_commands.append(f' --{option} "${option}"')
+        else:
+            assignments.append(f'{option}="{value}"')
+            raw = "-raw" if kind == "raw" else ""
+            python_commands.append(f' --{option}{raw} "${option}"')
 
     script_content += "\n".join(assignments) + "\n\n"
     script_content += "\n".join(read_commands) + "\n"
@@ -264,17 +310,159 @@ def generate_fru_script_content(fru_fields, script_type, board_pn):
     return script_content
 
 
-def generate_fru_scripts(excel_file, ict_mode=False):
-    wb = openpyxl.load_workbook(excel_file)
-    sheet = wb.active
+# fruid_util module per worker process, loaded by build_ict_files()
+_fruid_util = None
 
-    # Column A is for field name, so check start from column B
-    column_names = {
-        cell.column_letter: cell.value
-        for cell in sheet[1][1:]
-        if cell.value and not sheet.column_dimensions[cell.column_letter].hidden
-    }
-    columns = {col: name for col, name in column_names.items() if name}
+
+def load_fruid_util(util_path):
+    global _fruid_util
+    if _fruid_util is None:
+        spec = importlib.util.spec_from_file_location("fruid_util", util_path)
+        _fruid_util = importlib.util.module_from_spec(spec)
+        sys.modules["fruid_util"] = _fruid_util
+        spec.loader.exec_module(_fruid_util)
+    return _fruid_util
+
+
+def build_ict_files(util_path, bin_path, xlsx_path, options):
+    """Build one board's ICT bin and xlsx in-process, as the ICT script would
+    through fruid-util.py -m and -f."""
+    util = load_fruid_util(util_path)
+    values = {}
+    for option, kind, value in options:
+        values[f"{option}-raw" if kind == "raw" else option] = value
+
+    if os.path.exists(bin_path):
+        os.remove(bin_path)
+    fru = util.open_fru(Path(bin_path), create=True)
+    if util.apply_fields(fru, values, new_file=True):
+        if not fru.update_binary():
+            raise RuntimeError(f"Failed to build FRU binary {bin_path}")
+        fru.write_bin(Path(bin_path))
+    fru.export_excel(Path(xlsx_path))
+    return bin_path
+
+
+def local_name(element):
+    return element.tag.rsplit("}", 1)[-1]
+
+
+def sheet_path(archive, title):
+    """Locate the XML part of the worksheet named title in an xlsx archive.
+
+    Follows the package and workbook relationships (ECMA-376 Part 1) from
+    the <sheet name=...> entry of the workbook, as openpyxl does.
+    """
+
+    def relationships(part):
+        folder, name = posixpath.split(part)
+        rels = ElementTree.fromstring(
+            archive.read(posixpath.join(folder, "_rels", f"{name}.rels"))
+        )
+        targets = {}
+        for rel in rels:
+            target = rel.get("Target")
+            if target.startswith("/"):
+                target = target[1:]
+            else:
+                target = posixpath.normpath(posixpath.join(folder, target))
+            targets[rel.get("Id")] = (rel.get("Type").rsplit("/", 1)[-1], target)
+        return targets
+
+    workbook_path = next(
+        target
+        for kind, target in relationships("").values()
+        if kind == "officeDocument"
+    )
+    workbook = ElementTree.fromstring(archive.read(workbook_path))
+    sheet_id = next(
+        value
+        for element in workbook.iter()
+        if local_name(element) == "sheet" and element.get("name") == title
+        for key, value in element.items()
+        if key.endswith("}id")
+    )
+    return relationships(workbook_path)[sheet_id][1]
+
+
+def hidden_columns(excel_file, title):
+    """Return the letters of the hidden columns of the worksheet named title.
+
+    Read-only worksheets have no column_dimensions, so the <cols> element at
+    the top of the sheet XML is read straight from the xlsx archive, stopping
+    where the cell data starts.
+    """
+    with zipfile.ZipFile(excel_file) as archive:
+        try:
+            path = sheet_path(archive, title)
+        except (KeyError, StopIteration, ValueError) as e:
+            raise ValueError(
+                f"{excel_file}: cannot locate the XML of worksheet {title!r} ({e!r})"
+            ) from None
+
+        hidden = set()
+        with archive.open(path) as src:
+            for _, element in iterparse(src, events=("start",)):
+                tag = local_name(element)
+                if tag == "col" and element.get("hidden") in ("1", "true"):
+                    first, last = int(element.get("min")), int(element.get("max"))
+                    hidden.update(get_column_letter(i) for i in range(first, last + 1))
+                elif tag == "sheetData":
+                    break
+    return hidden
+
+
+def read_fru_columns(excel_file):
+    """Read the fru_fields of every board column in one pass over the rows.
+
+    Column A holds the field names and row 1 the board column names; hidden
+    and unnamed columns are skipped. Returns {column letter: fru_fields}.
+    """
+    wb = openpyxl.load_workbook(excel_file, read_only=True)
+    try:
+        sheet = wb.active
+        hidden = hidden_columns(excel_file, sheet.title)
+        rows = sheet.iter_rows(values_only=True)
+        header = next(rows, ())
+
+        # Column A is for field name, so check start from column B
+        columns = {
+            i: {}
+            for i, name in enumerate(header)
+            if i and name and get_column_letter(i + 1) not in hidden
+        }
+        for row in chain([header], rows):
+            field_name = row[0] if row else None
+            if not field_name:
+                continue
+            for i, fru_fields in columns.items():
+                if i < len(row) and row[i]:
+                    fru_fields[field_name] = row[i]
+    finally:
+        wb.close()
+
+    return {get_column_letter(i + 1): fields for i, fields in columns.items()}
+
+
+def file_digest(path):
+    return hashlib.sha256(Path(path).read_bytes()).hexdigest()
+
+
+def fields_digest(fru_fields):
+    text = json.dumps(fru_fields, sort_keys=True, default=str)
+    return hashlib.sha256(text.encode()).hexdigest()
+
+
+def load_build_manifest(path):
+    try:
+        with open(path) as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return {}
+
+
+def generate_fru_scripts(excel_file, ict_mode=False, jobs=0, force=False):
+    columns = read_fru_columns(excel_file)
     if not columns:
         print("Error: No valid data columns found in the Excel file.")
         sys.exit(1)
@@ -291,34 +479,54 @@ def generate_fru_scripts(excel_file, ict_mode=False):
     if ict_mode:
         os.makedirs(os.path.join(base_dir, "ICT"), exist_ok=True)
 
+    # The build manifest maps each output (relative to build/) to a hash of
+    # the board's fru_fields; outputs whose hash is unchanged are kept as
+    # they are, unless the tools changed since the last build.
+    manifest_path = os.path.join(base_dir, BUILD_MANIFEST)
+    manifest = load_build_manifest(manifest_path)
+    tools = {
+        "fruid-gen": __version__,
+        "fruid-gen.py": file_digest(__file__),
+        "fruid-util.py": file_digest("fruid-util.py"),
+        "fruid_util.py": file_digest("fruid_util.py"),
+    }
+    previous = manifest.get("outputs", {})
+    if force or manifest.get("tools") != tools:
+        previous = {}
+    outputs = {}
+    changed = []
+
     # Copy utility files
-    for file in ["fruid-util.py", "README.md"]:
-        shutil.copy(file, base_dir)
+    for file in ["fruid-util.py", "fruid_util.py", "README.md"]:
+        target = os.path.join(base_dir, file)
+        if not os.path.exists(target) or file_digest(file) != file_digest(target):
+            shutil.copy(file, base_dir)
+            changed.append(file)
 
     board_info = defaultdict(list)
     versions = ["v000"]
     script_content_map = {}
     ict_script_content_map = {}
 
-    for col in columns:
-        fru_fields = {}
-        for row in range(1, sheet.max_row + 1):
-            field_name = sheet[f"A{row}"].value
-            field_value = sheet[f"{col}{row}"].value
-            if field_name and field_value:
-                fru_fields[field_name] = field_value
-
+    for fru_fields in columns.values():
         board_pn = fru_fields.get("Board Part Number", "unknown")
         board_name = strip_field_content(fru_fields.get("Board Product", "unknown"))
         versions.append(get_version_from_fru_id(fru_fields))
+        digest = fields_digest(fru_fields)
 
         for stage in ["M1", "M3"]:
             key = (board_pn, stage)
             # Store first occurrence of each board+stage combination
             if key not in script_content_map:
-                script_content = generate_fru_script_content(
-                    fru_fields, stage, board_pn
-                )
+                output = f"{stage}/{board_pn}.sh"
+                outputs[output] = digest
+                script_content = None
+                if previous.get(output) != digest or not os.path.exists(
+                    os.path.join(base_dir, output)
+                ):
+                    script_content = generate_fru_script_content(
+                        fru_fields, stage, board_pn
+                    )
                 script_content_map[key] = {
                     "content": script_content,
                     "board_name": board_name,
@@ -326,57 +534,88 @@ def generate_fru_scripts(excel_file, ict_mode=False):
 
         if ict_mode:
             if board_pn not in ict_script_content_map:
-                ict_script_content = generate_fru_script_content(
-                    fru_fields, "ICT", board_pn
-                )
+                output = f"ICT/{board_pn}"
+                outputs[output] = digest
+                options = None
+                if previous.get(output) != digest or not os.path.exists(
+                    os.path.join(base_dir, output, f"{board_pn}.xlsx")
+                ):
+                    options = collect_field_options(fru_fields, "ICT", board_pn)
                 ict_script_content_map[board_pn] = {
-                    "content": ict_script_content,
+                    "options": options,
                     "board_name": board_name,
                 }
 
     # Write all scripts after processing all data
     for (board_pn, stage), data in script_content_map.items():
+        board_info[stage].append((board_pn, data["board_name"]))
+        if data["content"] is None:
+            continue
         output_script = os.path.join(base_dir, stage, f"{board_pn}.sh")
         with open(output_script, "w") as f:
             f.write(data["content"])
         os.chmod(output_script, 0o755)
-        board_info[stage].append((board_pn, data["board_name"]))
+        changed.append(output_script)
 
-    # Write ICT scripts and generate bin/xlsx files
+    # Build ICT bin/xlsx files in-process, boards in parallel
     if ict_mode:
+        util_path = os.path.join(base_dir, "fruid_util.py")
+        tasks = []
         for board_pn, data in ict_script_content_map.items():
+            board_info["ICT"].append((board_pn, data["board_name"]))
+            if data["options"] is None:
+                continue
             # Create directory for board output files
             board_dir = os.path.join(base_dir, "ICT", board_pn)
             os.makedirs(board_dir, exist_ok=True)
-
-            # Write temporary script directly in ICT directory
-            temp_script_path = os.path.join(base_dir, "ICT", f"__{board_pn}.sh")
-            with open(temp_script_path, "w") as f:
-                f.write(data["content"])
-            os.chmod(temp_script_path, 0o755)
-            board_info["ICT"].append((board_pn, data["board_name"]))
-
-            # Execute script to generate bin and xlsx files
-            bin_path = os.path.join(board_pn, f"{board_pn}.bin")
-            subprocess.run(
-                [f"./__{board_pn}.sh", bin_path],
-                cwd=os.path.join(base_dir, "ICT"),
-                check=True,
-                stdout=subprocess.PIPE,
-                stderr=subprocess.PIPE,
-            )
-            os.remove(temp_script_path)
+            bin_path = os.path.join(board_dir, f"{board_pn}.bin")
+            xlsx_path = os.path.join(board_dir, f"{board_pn}.xlsx")
+            tasks.append((util_path, bin_path, xlsx_path, data["options"]))
+            changed.append(board_dir)
+
+        jobs = jobs or os.cpu_count() or 1
+        if jobs == 1 or len(tasks) < 2:
+            for task in tasks:
+                build_ict_files(*task)
+        else:
+            with ProcessPoolExecutor(max_workers=jobs) as executor:
+                for _ in executor.map(build_ict_files, *zip(*tasks)):
+                    pass
+
+    # Remove outputs of boards no longer in the sheet (ICT outputs are only
+    # managed by -i builds)
+    for output, digest in manifest.get("outputs", {}).items():
+        if output in outputs:
+            continue
+        if output.startswith("ICT/") and not ict_mode:
+            outputs[output] = digest
+            continue
+        path = os.path.join(base_dir, output)
+        if os.path.isdir(path):
+            shutil.rmtree(path)
+        elif os.path.exists(path):
+            os.remove(path)
+        changed.append(path)
 
     # Create release note
-    create_release_note(base_dir, max(versions), board_info)
+    version = max(versions)
+    note = os.path.join(base_dir, f"FRU_Release_Note_{version}.txt")
+    if changed or not os.path.exists(note):
+        create_release_note(base_dir, version, board_info)
 
-    print(f"Scripts and files generated successfully in {base_dir}")
+    with open(manifest_path, "w") as f:
+        json.dump({"tools": tools, "outputs": outputs}, f, indent=2)
+
+    if changed:
+        print(f"Scripts and files generated successfully in {base_dir}")
+    else:
+        print(f"Scripts and files in {base_dir} are up to date")
 
 
 if __name__ == "__main__":
     parser = argparse.ArgumentParser(
         description="Generate FRU scripts from Excel data",
-        usage="python3 %(prog)s excel_file [-h] [-v] [-i]",
+        usage="python3 %(prog)s excel_file [-h] [-v] [-i] [-j N] [--force]",
     )
     parser.add_argument(
         "-v", "--version", action="version", version=f"fruid-gen {__version__}"
@@ -394,6 +633,19 @@ if __name__ == "__main__":
         action="store_true",
         help="generate ICT bin files and documents",
     )
+    parser.add_argument(
+        "-j",
+        "--jobs",
+        type=int,
+        default=0,
+        metavar="N",
+        help="build ICT files in N processes (default: 0, one per CPU)",
+    )
+    parser.add_argument(
+        "--force",
+        action="store_true",
+        help="regenerate every output, even if its board data did not change",
+    )
 
     args = parser.parse_args()
 
@@ -401,4 +653,4 @@ if __name__ == "__main__":
         print(f"Error: The specified Excel file '{args.excel_file}' does not exist.")
         sys.exit(1)
 
-    generate_fru_scripts(args.excel_file, args.ict)
+    generate_fru_scripts(args.excel_file, args.ict, args.jobs, args.force)
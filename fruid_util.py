@@ -0,0 +1,2714 @@
+import struct
+from datetime import datetime, timedelta
+from array import array
+from functools import partial
+import json
+import os
+from typing import (
+    Any,
+    AsyncIterator,
+    BinaryIO,
+    Callable,
+    Dict,
+    Iterable,
+    Iterator,
+    List,
+    Optional,
+    Tuple,
+    Union,
+)
+from dataclasses import dataclass, field
+from enum import Enum
+from pathlib import Path
+import logging
+import sys
+
+# argparse, csv, glob and concurrent.futures are imported where they are used,
+# so that plain reads and -g queries start quickly (see benchmarks/bench_startup.py)
+
+__version__ = "v2025.18.0"
+
+# Configure logging
+logging.basicConfig(level=logging.INFO, format="%(message)s")
+logger = logging.getLogger(__name__)
+
+CustomerDataMax = 26
+base_fields = {}
+base_fields["CPN"] = ("chassis", "Chassis Part Number")
+base_fields["CSN"] = ("chassis", "Chassis Serial Number")
+base_fields.update({f"CCD{i}": ("chassis", f"Chassis Custom Data {i}") for i in range(1, CustomerDataMax+1)})
+base_fields["BMD"] = ("board", "Board Mfg Date")
+base_fields["BM"] = ("board", "Board Mfg")
+base_fields["BP"] = ("board", "Board Product")
+base_fields["BSN"] = ("board", "Board Serial")
+base_fields["BPN"] = ("board", "Board Part Number")
+base_fields["BFI"] = ("board", "Board FRU ID")
+base_fields.update({f"BCD{i}": ("board", f"Board Custom Data {i}") for i in range(1, CustomerDataMax+1)})
+base_fields["PM"] = ("product", "Product Manufacturer")
+base_fields["PN"] = ("product", "Product Name")
+base_fields["PPN"] = ("product", "Product Part Number")
+base_fields["PV"] = ("product", "Product Version")
+base_fields["PSN"] = ("product", "Product Serial")
+base_fields["PAT"] = ("product", "Product Asset Tag")
+base_fields["PFI"] = ("product", "Product FRU ID")
+base_fields.update({f"PCD{i}": ("product", f"Product Custom Data {i}") for i in range(1, CustomerDataMax+1)})
+FieldMapping = Enum("FieldMapping", base_fields)
+
+# Lookup tables built once for every field slot, so that parsing and building
+# never format or split field names:
+#   FIELD_NAMES[area]: type/length field index -> full field name
+#   FIELD_INDEX[area]: full field name -> type/length field index
+#   FIELD_ENUMS: full field name -> FieldMapping member
+FIELD_NAMES: Dict[str, Tuple[str, ...]] = {}
+FIELD_ENUMS: Dict[str, Any] = {}
+for _member in FieldMapping:
+    _area, _name = _member.value[:2]
+    FIELD_ENUMS[_name] = _member
+    if _name != "Board Mfg Date":  # Fixed-position date, not a type/length field
+        FIELD_NAMES[_area] = FIELD_NAMES.get(_area, ()) + (_name,)
+FIELD_INDEX = {
+    area: {name: i for i, name in enumerate(names)}
+    for area, names in FIELD_NAMES.items()
+}
+# FieldMapping name -> fixed slot number, used by compact FRU records
+FIELD_SLOTS = {member.name: i for i, member in enumerate(FieldMapping)}
+
+# Detail display types for FRU.detail_row
+SHOW_VALUE = 1  # Append the printable characters to the description
+SHOW_XX = 2  # Mask the value as XXh (varies per unit)
+# bytes.translate table rendering SHOW_VALUE bytes as printable ASCII
+PRINTABLE_ASCII = bytes(b if 32 <= b < 127 else ord("?") for b in range(256))
+
+@dataclass
+class MultiRecord:
+    offset: int  # Offset of the record header in the image
+    type_id: int
+    format_version: int
+    end_of_list: bool
+    data: bytes
+
+
+@dataclass
+class FRU:
+    EPOCH: datetime = field(default=datetime(1996, 1, 1), init=False)
+    common_header: list = field(default_factory=list)
+    chassis_info: Dict[str, Any] = field(default_factory=dict)
+    board_info: Dict[str, Any] = field(default_factory=dict)
+    product_info: Dict[str, Any] = field(default_factory=dict)
+    raw_data: bytearray = field(default_factory=bytearray)
+    detail_data: List[List[str]] = field(default_factory=list)
+    modified_fields: List[str] = field(default_factory=list)
+
+    FIELD_ORDER = {
+        "chassis": ["Chassis Part Number", "Chassis Serial Number"],
+        "board": [
+            "Board Mfg",
+            "Board Product",
+            "Board Serial",
+            "Board Part Number",
+            "Board FRU ID",
+        ],
+        "product": [
+            "Product Manufacturer",
+            "Product Name",
+            "Product Part Number",
+            "Product Version",
+            "Product Serial",
+            "Product Asset Tag",
+            "Product FRU ID",
+        ],
+    }
+
+    def parse_bin(
+        self, filename: Path, detailed: bool = False, partial_read: bool = False
+    ) -> None:
+        if filename is not None and partial_read:
+            self.raw_data = read_fru_file(filename)
+        elif filename is not None:
+            with filename.open("rb") as f:
+                self.raw_data = bytearray(f.read())
+        elif not self.raw_data:
+            raise ValueError("No raw data available and no filename provided")
+
+        self.common_header = list(struct.unpack_from("BBBBBBBB", self.raw_data))
+        if detailed:
+            self.detail_data = list(self.iter_detail_rows())
+
+        for area, offset in [("chassis", 2), ("board", 3), ("product", 4)]:
+            if self.common_header[offset]:
+                self.parse_area(area, self.common_header[offset] * 8)
+
+    def parse_area(
+        self, area_name: str, area_offset: int, detailed: bool = False
+    ) -> None:
+        if area_offset + 2 > len(self.raw_data):
+            return
+
+        area_len = self.raw_data[area_offset + 1] * 8
+        if area_len < 8 or area_offset + area_len > len(self.raw_data):
+            return
+
+        if detailed:
+            self.detail_data.extend(self.iter_area_detail_rows(area_name, area_offset))
+
+        # Slice a view of raw_data so that neither the area nor its fields are
+        # copied; only the decoded field strings are materialized.
+        data = memoryview(self.raw_data)[area_offset : area_offset + area_len]
+        info = {}
+        offset = 2  # Skip format version and area length
+
+        if area_name == "chassis":
+            info["Chassis Type"] = data[offset]
+            offset += 1
+        elif area_name in ["board", "product"]:
+            info["Language"] = data[offset]
+            offset += 1
+            if area_name == "board":
+                info["Board Mfg Date"] = self.parse_mfg_date(data[offset : offset + 3])
+                offset += 3
+
+        sum_offset = area_len - 1  # -1 to account for checksum
+        while offset < sum_offset:
+            type_length = data[offset]
+            if type_length == 0xC1:  # End of area
+                break
+
+            length = type_length & 0x3F
+            field_value = data[offset + 1 : offset + 1 + length]
+            field_name = self.get_field_name(
+                area_name, len(info) - (2 if area_name == "board" else 1)
+            )
+            info[field_name] = self.decode_field(field_value)
+            offset += 1 + length
+
+        # Checksum
+        calculated_checksum = self.calculate_checksum(data[:sum_offset])
+        stored_checksum = data[sum_offset]
+        if calculated_checksum != stored_checksum:
+            logger.warning(
+                f"{area_name.capitalize()} area checksum mismatch: "
+                f"calculated {calculated_checksum}, stored {stored_checksum}"
+            )
+
+        setattr(self, f"{area_name}_info", info)
+
+    def iter_detail_rows(self) -> Iterator[List[str]]:
+        """Yield the detailed dump of raw_data row by row.
+
+        Rows are [offset, value, description], starting with a title row and
+        with blank rows between the common header and each info area, so a
+        report can be written out without holding the whole table
+        (parse_bin(detailed=True) still collects them into detail_data).
+        """
+        header = struct.unpack_from("BBBBBBBB", self.raw_data)
+        yield ["Offset", "Value", "Description"]
+        fields = [
+            "Common Header Format Version",
+            "Internal Use Area Offset",
+            "Chassis Info Area Offset",
+            "Board Info Area Offset",
+            "Product Info Area Offset",
+            "MultiRecord Area Offset",
+            "Pad",
+            "Common Header Checksum",
+        ]
+        for i, field in enumerate(fields):
+            yield self.detail_row(i, header[i], field)
+        yield ["", "", ""]
+
+        for area, offset in [("chassis", 2), ("board", 3), ("product", 4)]:
+            area_offset = header[offset] * 8
+            if not area_offset or area_offset + 2 > len(self.raw_data):
+                continue
+            area_len = self.raw_data[area_offset + 1] * 8
+            if area_len >= 8 and area_offset + area_len <= len(self.raw_data):
+                yield from self.iter_area_detail_rows(area, area_offset)
+
+    def iter_area_detail_rows(
+        self, area_name: str, area_offset: int
+    ) -> Iterator[List[str]]:
+        """Yield the detailed rows of one info area whose bounds are valid."""
+        area_len = self.raw_data[area_offset + 1] * 8
+        data = memoryview(self.raw_data)[area_offset : area_offset + area_len]
+        row = self.detail_row
+        area_title = f"{area_name.capitalize()} Info Area"
+        yield row(area_offset, data[0], f"{area_title} Format Version")
+        yield row(area_offset + 1, data[1], f"{area_title} Length")
+
+        offset = 2  # Skip format version and area length
+        if area_name == "chassis":
+            yield row(area_offset + offset, data[offset], "Chassis Type")
+            offset += 1
+        else:
+            yield row(area_offset + offset, data[offset], "Language Code")
+            offset += 1
+            if area_name == "board":
+                date = data[offset : offset + 3]
+                yield row(area_offset + offset, date, "MFG Date Time", SHOW_XX)
+                offset += 3
+
+        sum_offset = area_len - 1  # -1 to account for checksum
+        index = 0
+        while offset < sum_offset:
+            type_length = data[offset]
+            if type_length == 0xC1:  # End of area
+                break
+
+            length = type_length & 0x3F
+            field_value = data[offset + 1 : offset + 1 + length]
+            field_name = self.get_field_name(area_name, index)
+            yield row(area_offset + offset, type_length, f"{field_name} Type/Length")
+            if length > 0:
+                yield row(area_offset + offset + 1, field_value, field_name, SHOW_VALUE)
+            index += 1
+            offset += 1 + length
+
+        if offset < sum_offset and data[offset] == 0xC1:
+            yield row(area_offset + offset, data[offset], "End of Field Marker")
+            offset += 1
+            if sum_offset > offset:
+                yield row(area_offset + offset, data[offset:sum_offset], "Pad")
+
+        yield row(
+            area_offset + sum_offset,
+            data[sum_offset],
+            f"{area_name.capitalize()} Info Area Checksum",
+            0 if area_name == "chassis" else SHOW_XX,
+        )
+        yield ["", "", ""]
+
+    def append_detail_row(
+        self,
+        offset: int,
+        data: Union[int, bytes, bytearray, memoryview],
+        desc: str,
+        show: int = 0,
+    ) -> None:
+        self.detail_data.append(self.detail_row(offset, data, desc, show))
+
+    @staticmethod
+    def detail_row(
+        offset: int,
+        data: Union[int, bytes, bytearray, memoryview],
+        desc: str,
+        show: int = 0,
+    ) -> List[str]:
+        if isinstance(data, (bytes, bytearray, memoryview)):
+            length = len(data)
+            if length == 1:
+                offset_str = f"{offset:02X}h"
+            else:
+                offset_str = f"{offset:02X}h:{offset+length-1:02X}h"
+
+            if show == SHOW_XX:
+                value_str = " ".join(["XXh"] * length)
+            elif length:
+                value_str = data.hex(" ").upper().replace(" ", "h ") + "h"
+            else:
+                value_str = ""
+
+            if show == SHOW_VALUE:
+                desc_value = bytes(data).translate(PRINTABLE_ASCII, b"\0").decode()
+                if desc_value:
+                    desc = f"{desc}: [{desc_value}]"
+        else:
+            offset_str = f"{offset:02X}h"
+            value_str = "XXh" if show == SHOW_XX else f"{data:02X}h"
+
+        return [offset_str, value_str, desc]
+
+    @staticmethod
+    def decode_field(data: Union[bytes, memoryview]) -> str:
+        return str(data, "ascii").rstrip("\0")
+
+    @classmethod
+    def parse_mfg_date(cls, date_bytes: Union[bytes, memoryview]) -> Dict[str, Any]:
+        minutes = int.from_bytes(date_bytes, "little")
+        return {"minutes": minutes, "date": cls.minutes_to_date_string(minutes)}
+
+    @classmethod
+    def minutes_to_date_string(cls, minutes: int) -> str:
+        return (cls.EPOCH + timedelta(minutes=minutes)).strftime("%Y-%m-%d %H:%M:%S")
+
+    @classmethod
+    def get_field_name(cls, area_name: str, index: int) -> str:
+        names = FIELD_NAMES[area_name]
+        if index < len(names):
+            return names[index]
+        # Beyond the FieldMapping custom data slots
+        return f"{area_name.capitalize()} Custom Data {index - len(cls.FIELD_ORDER[area_name]) + 1}"
+
+    def modify_field(self, field: str, value: Union[str, bytes]) -> None:
+        area, full_field = FieldMapping[field].value[:2]
+        info = getattr(self, f"{area}_info")
+        if field == "BMD":
+            date = datetime.strptime(value, "%Y-%m-%d %H:%M:%S")
+            minutes = int((date - self.EPOCH).total_seconds() / 60)
+            info["Board Mfg Date"] = {"minutes": minutes, "date": value}
+        else:
+            info[full_field] = value
+        if field not in self.modified_fields:
+            self.modified_fields.append(field)
+
+    def patch_field(self, field: str) -> bool:
+        """Overwrite a modified field in raw_data if its length is unchanged.
+
+        Only the field bytes and the checksum of its area are rewritten.
+        Returns False if the field is not in raw_data or changes length.
+        """
+        area, full_field = FieldMapping[field].value[:2]
+        if len(self.raw_data) < 8:
+            return False
+        span = FRUView(self.raw_data).index(area).get(full_field)
+        if span is None:
+            return False
+
+        offset, length = span
+        value = getattr(self, f"{area}_info")[full_field]
+        if full_field == "Board Mfg Date":
+            self.raw_data[offset : offset + 3] = struct.pack("<I", value["minutes"])[:3]
+        else:
+            encoded_value = (
+                value.encode("ascii") if isinstance(value, str) else bytes(value)
+            )
+            if len(encoded_value) != length or length == 1:
+                return False
+            self.raw_data[offset - 1] = 0xC0 | length if length else 0x00
+            self.raw_data[offset : offset + length] = encoded_value
+
+        area_offset = self.common_header[FRUView.AREA_HEADER[area]] * 8
+        sum_offset = area_offset + self.raw_data[area_offset + 1] * 8 - 1
+        with memoryview(self.raw_data) as view:
+            checksum = self.calculate_checksum(view[area_offset:sum_offset])
+        self.raw_data[sum_offset] = checksum
+        return True
+
+    def update_binary(self) -> bool:
+        """Apply modified fields to raw_data, patching in place when possible.
+
+        Falls back to rebuild_fru_binary() when any field changes length.
+        """
+        if not all(self.patch_field(field) for field in self.modified_fields):
+            return self.rebuild_fru_binary()
+        self.modified_fields.clear()
+        return True
+
+    @staticmethod
+    def calculate_checksum(data: Union[bytes, bytearray, memoryview]) -> int:
+        return (0x100 - sum(data)) & 0xFF
+
+    def write_bin(self, filename: Path) -> None:
+        with filename.open("wb") as f:
+            f.write(self.raw_data)
+
+    def write_changes(self, filename: Path) -> int:
+        """Write only the byte ranges of raw_data that differ from filename.
+
+        Meant for EEPROM device nodes: the target is never truncated and bytes
+        beyond the image are left as they are. Returns the bytes written.
+        """
+        if not filename.exists():
+            self.write_bin(filename)
+            return len(self.raw_data)
+
+        fd = os.open(filename, os.O_RDWR)
+        try:
+            current = bytearray()
+            while len(current) < len(self.raw_data):
+                chunk = os.pread(fd, len(self.raw_data) - len(current), len(current))
+                if not chunk:
+                    break
+                current.extend(chunk)
+
+            written = 0
+            with memoryview(self.raw_data) as view:
+                for start, end in self.diff_ranges(current, self.raw_data):
+                    while start < end:
+                        count = os.pwrite(fd, view[start:end], start)
+                        start += count
+                        written += count
+        finally:
+            os.close(fd)
+        return written
+
+    @staticmethod
+    def diff_ranges(old: bytes, new: bytes) -> List[Tuple[int, int]]:
+        """Return [start, end) ranges where new differs from (or extends) old."""
+        ranges = []
+        start = None
+        for i, b in enumerate(new):
+            if i < len(old) and old[i] == b:
+                if start is not None:
+                    ranges.append((start, i))
+                    start = None
+            elif start is None:
+                start = i
+        if start is not None:
+            ranges.append((start, len(new)))
+        return ranges
+
+    def build_area(self, area_name: str) -> bytearray:
+        info = getattr(self, f"{area_name}_info")
+        area_data = bytearray([0x01, 0])  # Format version and initial length
+
+        # Add area-specific headers
+        if area_name == "chassis":
+            # Sometimes during test chassis type might be changed
+            # area_data.append(info.get("Chassis Type", 0x17))
+            area_data.append(0x17)
+        elif area_name in ["board", "product"]:
+            area_data.append(info.get("Language", 0x19))
+            if area_name == "board":
+                mfg_date = info.get("Board Mfg Date", {"minutes": 0})
+                area_data.extend(struct.pack("<I", mfg_date["minutes"])[:3])
+
+        # Add all fields including custom data up to the highest one used
+        field_index = FIELD_INDEX[area_name]
+        field_count = len(self.FIELD_ORDER[area_name])
+        for key in info:
+            if key in field_index:
+                field_count = max(field_count, field_index[key] + 1)
+            elif " Custom Data " in key:  # Beyond the FieldMapping slots
+                field_count = max(
+                    field_count,
+                    len(self.FIELD_ORDER[area_name]) + int(key.rsplit(" ", 1)[1]),
+                )
+        fields = [self.get_field_name(area_name, i) for i in range(field_count)]
+
+        for field in fields:
+            if field in info and info[field]:
+                value = info[field]
+                encoded_value = (
+                    value.encode("ascii") if isinstance(value, str) else bytes(value)
+                )
+                if len(encoded_value) == 1:
+                    raise ValueError(
+                        f"Field '{field}' must have a length of at least 2 characters."
+                    )
+
+                if len(encoded_value) > 63:
+                    logger.warning(
+                        f"Field '{field}' is too long and will be truncated."
+                    )
+                    encoded_value = encoded_value[:63]
+                area_data.extend([0xC0 | len(encoded_value)])
+                area_data.extend(encoded_value)
+            else:
+                area_data.extend([0x00])  # Empty or non-existent field
+
+        # Finalize area
+        area_data.extend([0xC1])  # End of area marker
+        area_data.extend([0] * (-(len(area_data) + 1) % 8))  # Pad to 8-byte boundary
+        area_data[1] = (len(area_data) + 1) // 8  # Update area length
+        area_data.append(self.calculate_checksum(area_data))
+
+        return area_data
+
+    def iter_multirecords(self) -> Iterator[MultiRecord]:
+        """Walk the MultiRecord area one record at a time.
+
+        Header and data checksums are validated per record; a ValueError is
+        raised at the first bad or truncated record. Stops after the record
+        flagged end-of-list.
+        """
+        offset = self.common_header[5] * 8 if self.common_header else 0
+        if not offset:
+            return
+
+        data = self.raw_data
+        while offset + 5 <= len(data):
+            header = data[offset : offset + 5]
+            if self.calculate_checksum(header[:4]) != header[4]:
+                raise ValueError(
+                    f"MultiRecord header checksum mismatch at {offset:02X}h"
+                )
+
+            record_data = bytes(data[offset + 5 : offset + 5 + header[2]])
+            if len(record_data) < header[2]:
+                raise ValueError(f"MultiRecord at {offset:02X}h is truncated")
+            if self.calculate_checksum(record_data) != header[3]:
+                raise ValueError(
+                    f"MultiRecord data checksum mismatch at {offset:02X}h"
+                )
+
+            end_of_list = bool(header[1] & 0x80)
+            yield MultiRecord(
+                offset, header[0], header[1] & 0x0F, end_of_list, record_data
+            )
+            if end_of_list:
+                return
+            offset += 5 + header[2]
+
+        raise ValueError("MultiRecord area has no end-of-list record")
+
+    def verify(self) -> List[Dict[str, Any]]:
+        """Check raw_data structure without decoding any field.
+
+        Walks the common header, info area bounds and lengths, type/length
+        field boundaries, area checksums and MultiRecord checksums. Returns
+        one {"Offset", "Area", "Check", "Message"} finding per problem.
+        """
+        findings: List[Dict[str, Any]] = []
+
+        def report(offset: int, area: str, check: str, message: str) -> None:
+            findings.append(
+                {"Offset": offset, "Area": area, "Check": check, "Message": message}
+            )
+
+        data = self.raw_data
+        if len(data) < 8:
+            report(0, "header", "length", f"image is only {len(data)} bytes")
+            return findings
+        if data[0] != 0x01:
+            report(0, "header", "format", f"unsupported format version {data[0]:02X}h")
+        if self.calculate_checksum(data[:7]) != data[7]:
+            report(7, "header", "checksum", "common header checksum mismatch")
+
+        extents = []
+        for area_name, index in FRUView.AREA_HEADER.items():
+            area_offset = data[index] * 8
+            if not area_offset:
+                continue
+            if area_offset + 2 > len(data):
+                report(index, area_name, "bounds", "area is past the end of the image")
+                continue
+            area_len = data[area_offset + 1] * 8
+            if area_len < 8 or area_offset + area_len > len(data):
+                report(
+                    area_offset + 1, area_name, "length", f"invalid length {area_len}"
+                )
+                continue
+            extents.append((area_offset, area_offset + area_len, area_name))
+            if data[area_offset] != 0x01:
+                report(
+                    area_offset,
+                    area_name,
+                    "format",
+                    f"unsupported format version {data[area_offset]:02X}h",
+                )
+
+            sum_offset = area_offset + area_len - 1
+            offset = area_offset + {"chassis": 3, "board": 6, "product": 3}[area_name]
+            while offset < sum_offset and data[offset] != 0xC1:
+                end = offset + 1 + (data[offset] & 0x3F)
+                if end > sum_offset:
+                    report(offset, area_name, "field", "field runs past the checksum")
+                    break
+                offset = end
+            else:
+                if offset >= sum_offset:
+                    report(sum_offset, area_name, "field", "no end-of-fields marker")
+
+            with memoryview(data) as view:
+                checksum = self.calculate_checksum(view[area_offset:sum_offset])
+            if checksum != data[sum_offset]:
+                report(sum_offset, area_name, "checksum", "area checksum mismatch")
+
+        extents.sort()
+        for (_, end, name), (start, _, next_name) in zip(extents, extents[1:]):
+            if start < end:
+                report(start, next_name, "overlap", f"area overlaps {name} area")
+
+        offset = data[5] * 8
+        try:
+            for record in self.iter_multirecords():
+                offset = record.offset + 5 + len(record.data)
+        except ValueError as e:
+            report(offset, "multirecord", "record", str(e))
+
+        return findings
+
+    def multirecord_area(self) -> bytes:
+        """Return the MultiRecord area as stored, up to its end-of-list record."""
+        start = offset = self.common_header[5] * 8 if self.common_header else 0
+        if not offset:
+            return b""
+
+        data = self.raw_data
+        while offset + 5 <= len(data):
+            end_of_list = data[offset + 1] & 0x80
+            offset += 5 + data[offset + 2]
+            if end_of_list:
+                break
+        return bytes(data[start : min(offset, len(data))])
+
+    def internal_use_area(self) -> bytes:
+        """Return the Internal Use area, which extends up to the next area."""
+        start = self.common_header[1] * 8 if self.common_header else 0
+        if not start:
+            return b""
+
+        following = [o * 8 for o in self.common_header[2:6] if o * 8 > start]
+        return bytes(self.raw_data[start : min(following, default=len(self.raw_data))])
+
+    def rebuild_fru_binary(self) -> bool:
+        # Internal Use and MultiRecord areas are not decoded; keep them as is
+        internal_use = self.internal_use_area()
+        multirecord = self.multirecord_area()
+        new_data = bytearray(8)  # Space for common header
+
+        self.common_header[1] = 0
+        if internal_use:
+            self.common_header[1] = len(new_data) // 8
+            new_data.extend(internal_use)
+            new_data.extend(bytes(-len(new_data) % 8))
+
+        for i, area in enumerate(["chassis", "board", "product"]):
+            if getattr(self, f"{area}_info"):
+                try:
+                    area_data = self.build_area(area)
+                except ValueError as e:
+                    logger.error(f"Error building {area} area: {e}")
+                    return False
+                self.common_header[i + 2] = len(new_data) // 8
+                new_data.extend(area_data)
+
+        self.common_header[5] = 0
+        if multirecord:
+            self.common_header[5] = len(new_data) // 8
+            new_data.extend(multirecord)
+
+        struct.pack_into("BBBBBBBB", new_data, 0, *self.common_header)
+        new_data[7] = self.calculate_checksum(new_data[:7])
+        self.raw_data = new_data
+        self.modified_fields.clear()
+        return True
+
+    def export_excel(self, filename: Path) -> None:
+        try:
+            import xlsxwriter
+        except ImportError:
+            logger.error("xlsxwriter module is not installed.")
+            sys.exit(1)
+
+        # Rows are streamed from iter_detail_rows() and flushed to disk row by
+        # row (constant_memory), so neither side holds the whole table.
+        workbook = xlsxwriter.Workbook(str(filename), {"constant_memory": True})
+        worksheet = workbook.add_worksheet("FRU Data")
+
+        header_format = workbook.add_format(
+            {
+                "font_name": "Arial",
+                "font_size": 12,
+                "bold": True,
+                "border": 1,
+                "align": "center",
+                "valign": "vcenter",
+                "text_wrap": True,
+            }
+        )
+        cell_format = workbook.add_format(
+            {
+                "font_name": "Consolas",
+                "font_size": 12,
+                "border": 1,
+                "valign": "vcenter",
+                "text_wrap": True,
+            }
+        )
+
+        # Set column widths
+        worksheet.set_column("A:A", 15)  # Offset column
+        worksheet.set_column("B:B", 40)  # Value column
+        worksheet.set_column("C:C", 50)  # Description column
+        CHARS_PER_LINE = 32
+
+        # Write data to worksheet
+        for row_idx, row_data in enumerate(self.iter_detail_rows()):
+            # Apply row height based on content of value column
+            if row_idx > 0 and len(row_data) > 1 and row_data[1]:
+                line_count = (len(row_data[1]) + CHARS_PER_LINE - 1) // CHARS_PER_LINE
+                if line_count > 1:
+                    worksheet.set_row(row_idx, 15 * line_count)
+
+            for col_idx, cell_value in enumerate(row_data):
+                if row_idx == 0:  # Header row
+                    worksheet.write(row_idx, col_idx, cell_value, header_format)
+                else:
+                    worksheet.write(row_idx, col_idx, cell_value, cell_format)
+
+        workbook.close()
+
+
+class FRUView:
+    """Read-only view of a FRU image that decodes fields on access.
+
+    Only the common header is read up front. Info areas are indexed (field
+    name -> offset and length of the value in the image) on first touch, and
+    only as far as the requested field; values are then decoded one at a
+    time, so reading a few fields never decodes the rest of the image.
+    """
+
+    AREA_HEADER = {"chassis": 2, "board": 3, "product": 4}
+
+    def __init__(self, raw_data: Union[bytes, bytearray]) -> None:
+        self.raw_data = raw_data
+        self.common_header = list(struct.unpack_from("BBBBBBBB", raw_data))
+        self._index: Dict[str, Dict[str, Tuple[int, int]]] = {}
+        self._cursor: Dict[str, Tuple[int, int, int]] = {}
+
+    @classmethod
+    def from_file(cls, filename: Path) -> "FRUView":
+        with filename.open("rb") as f:
+            return cls(f.read())
+
+    def index(self, area_name: str) -> Dict[str, Tuple[int, int]]:
+        """Return {field name: (offset, length)} for every field of an area."""
+        return self._scan(area_name)
+
+    def _scan(self, area_name: str, until: str = None) -> Dict[str, Tuple[int, int]]:
+        """Extend the index of an area until field `until` (or the end) is reached."""
+        index = self._index.get(area_name)
+        if index is None:
+            index = self._index[area_name] = self._start_index(area_name)
+        cursor = self._cursor.get(area_name)
+        if cursor is None or until in index:
+            return index
+
+        data = self.raw_data
+        offset, field_index, area_end = cursor
+        while offset < area_end - 1:  # -1 to account for checksum
+            type_length = data[offset]
+            if type_length == 0xC1:  # End of area
+                break
+
+            length = min(type_length & 0x3F, area_end - offset - 1)
+            field_name = FRU.get_field_name(area_name, field_index)
+            index[field_name] = (offset + 1, length)
+            field_index += 1
+            offset += 1 + length
+            if field_name == until:
+                self._cursor[area_name] = (offset, field_index, area_end)
+                return index
+
+        del self._cursor[area_name]
+        return index
+
+    def _start_index(self, area_name: str) -> Dict[str, Tuple[int, int]]:
+        index: Dict[str, Tuple[int, int]] = {}
+        data = self.raw_data
+        area_offset = self.common_header[self.AREA_HEADER[area_name]] * 8
+        if not area_offset or area_offset + 2 > len(data):
+            return index
+
+        area_end = area_offset + data[area_offset + 1] * 8
+        if area_end - area_offset < 8 or area_end > len(data):
+            return index
+
+        offset = area_offset + 2  # Skip format version and area length
+        if area_name == "chassis":
+            index["Chassis Type"] = (offset, 1)
+            offset += 1
+        else:
+            index["Language"] = (offset, 1)
+            offset += 1
+            if area_name == "board":
+                index["Board Mfg Date"] = (offset, 3)
+                offset += 3
+
+        self._cursor[area_name] = (offset, 0, area_end)
+        return index
+
+    def get(self, field: str, default: Any = None) -> Any:
+        """Decode one field, given its FieldMapping name (e.g. "BSN") or full name."""
+        member = FieldMapping.__members__.get(field) or FIELD_ENUMS.get(field)
+        if member is not None:
+            area_name, field = member.value[:2]
+        else:
+            area_name = field.split(" ", 1)[0].lower()
+            if area_name not in self.AREA_HEADER:
+                return default
+
+        span = self._scan(area_name, field).get(field)
+        if span is None:
+            return default
+
+        offset, length = span
+        value = memoryview(self.raw_data)[offset : offset + length]
+        if field == "Chassis Type":
+            return value[0]
+        if field == "Board Mfg Date":
+            return FRU.parse_mfg_date(value)
+        return FRU.decode_field(value)
+
+    def __getitem__(self, field: str) -> Any:
+        value = self.get(field, self)
+        if value is self:
+            raise KeyError(field)
+        return value
+
+    def __contains__(self, field: str) -> bool:
+        return self.get(field, self) is not self
+
+    def to_fru(self) -> FRU:
+        fru = FRU(raw_data=bytearray(self.raw_data))
+        fru.parse_bin(None)
+        return fru
+
+
+class FRUStore:
+    """Compact in-memory inventory of many FRU images.
+
+    All images are appended to one shared buffer. For each image the store
+    keeps its start offset and, per FieldMapping slot, the (offset, length)
+    of the value within the image; a FRURecord is just (store, index).
+    """
+
+    SLOTS = len(FieldMapping)
+
+    def __init__(self) -> None:
+        self.buffer = bytearray()
+        self.starts = array("I")
+        self.ends = array("I")
+        self.spans = array("H")  # 2 * SLOTS entries per image, offset 0 = absent
+
+    def __len__(self) -> int:
+        return len(self.starts)
+
+    def __getitem__(self, index: int) -> "FRURecord":
+        if not -len(self) <= index < len(self):
+            raise IndexError("FRUStore index out of range")
+        return FRURecord(self, index % len(self))
+
+    def __iter__(self) -> Iterator["FRURecord"]:
+        return (FRURecord(self, i) for i in range(len(self)))
+
+    def add(self, source: Union[FRU, bytes, bytearray]) -> "FRURecord":
+        """Append an image (or the raw_data of a FRU) and return its record."""
+        if isinstance(source, FRU):
+            if source.modified_fields:
+                raise ValueError("FRU has modified fields; call update_binary() first")
+            source = source.raw_data
+
+        view = FRUView(bytes(source))
+        spans = [0] * (2 * self.SLOTS)
+        for area_name in FRUView.AREA_HEADER:
+            for name, (offset, length) in view.index(area_name).items():
+                member = FIELD_ENUMS.get(name)
+                if member is not None:
+                    slot = FIELD_SLOTS[member.name]
+                    spans[2 * slot] = offset
+                    spans[2 * slot + 1] = length
+
+        self.starts.append(len(self.buffer))
+        self.buffer.extend(source)
+        self.ends.append(len(self.buffer))
+        self.spans.extend(spans)
+        return FRURecord(self, len(self) - 1)
+
+
+class FRURecord:
+    """One image of a FRUStore, with fields decoded from the shared buffer."""
+
+    __slots__ = ("store", "index")
+
+    def __init__(self, store: FRUStore, index: int) -> None:
+        self.store = store
+        self.index = index
+
+    @classmethod
+    def from_fru(cls, fru: FRU, store: FRUStore) -> "FRURecord":
+        return store.add(fru)
+
+    @property
+    def raw_data(self) -> bytes:
+        store = self.store
+        return bytes(store.buffer[store.starts[self.index] : store.ends[self.index]])
+
+    def get(self, field: str, default: Any = None) -> Any:
+        """Decode one field by FieldMapping name (e.g. "BSN")."""
+        store = self.store
+        slot = 2 * (FIELD_SLOTS[field] + self.index * FRUStore.SLOTS)
+        offset = store.spans[slot]
+        if not offset:
+            return default
+
+        start = store.starts[self.index] + offset
+        value = memoryview(store.buffer)[start : start + store.spans[slot + 1]]
+        if field == "BMD":
+            return FRU.parse_mfg_date(value)
+        return FRU.decode_field(value)
+
+    def __getitem__(self, field: str) -> Any:
+        value = self.get(field, self)
+        if value is self:
+            raise KeyError(field)
+        return value
+
+    def to_fru(self) -> FRU:
+        fru = FRU(raw_data=bytearray(self.raw_data))
+        fru.parse_bin(None)
+        return fru
+
+
+class FRUEncoder(json.JSONEncoder):
+    def default(self, obj):
+        if isinstance(obj, dict) and "minutes" in obj and "date" in obj:
+            return obj["date"]
+        return super().default(obj)
+
+
+def open_fru(filename: Path, create: bool = False, partial_read: bool = False) -> FRU:
+    """Parse a FRU file, or start an empty image if create is set and it is missing."""
+    fru = FRU()
+    if create and not filename.exists():
+        fru.common_header = [0x01, 0x00, 0x00, 0x00, 0x00, 0x00, 0x00, 0x00]
+    else:
+        fru.parse_bin(filename, partial_read=partial_read)
+    return fru
+
+
+def apply_fields(
+    fru: FRU, values: Dict[str, Any], new_file: bool = False
+) -> bool:
+    """Apply edits keyed by FieldMapping name, or "<name>-raw" for hex bytes.
+
+    Values of None are skipped; anything else that is not a string is
+    rejected before any field is touched. Returns whether any field was
+    modified.
+    """
+    for name, value in values.items():
+        if value is not None and not isinstance(value, str):
+            raise ValueError(f"{name}: expected a string, got {type(value).__name__}")
+
+    modified = False
+    for field in FieldMapping:
+        value = values.get(field.name)
+        if value is not None:
+            fru.modify_field(field.name, value)
+            modified = True
+            continue
+
+        value = values.get(f"{field.name}-raw")
+        if value is not None:
+            byte_value = bytes(int(x, 16) for x in value.split())
+            fru.modify_field(field.name, byte_value)
+            modified = True
+
+    if modified and new_file and fru.board_info:
+        if "Board Mfg Date" not in fru.board_info:
+            date_now = datetime.now().strftime("%Y-%m-%d %H:%M:%S")
+            fru.modify_field("BMD", date_now)
+
+    return modified
+
+
+def fru_to_dict(fru: FRU) -> Dict[str, Any]:
+    return {
+        "Chassis Info": fru.chassis_info,
+        "Board Info": {
+            k: v["date"] if isinstance(v, dict) and "date" in v else v
+            for k, v in fru.board_info.items()
+        },
+        "Product Info": fru.product_info,
+    }
+
+
+class FRUStamper:
+    """Stamps unit images (e.g. with their own BSN/PSN/PAT) out of one base image.
+
+    The base is indexed once: for each field that units may set, the offset
+    and length of its value are recorded, and for each area the sum of the
+    bytes no unit changes. A unit whose values keep those lengths is
+    stamped by copying the base and writing only its values and the area
+    checksums. Any other unit is built through FRU.update_binary(), and its
+    image becomes the base, so that following units of the same lengths
+    are patched again. Fields a unit leaves unset keep the base values.
+    """
+
+    def __init__(self, base: Union[bytes, bytearray], fields: Iterable[str]) -> None:
+        self.rebuilt = 0
+        view = FRUView(bytes(base))
+        # Base values of the stamped text fields, for units that leave them unset
+        self.defaults: Dict[str, str] = {}
+        for name in fields:
+            if name in FieldMapping.__members__ and name != "BMD":
+                value = view.get(name)
+                if value is not None:
+                    self.defaults[name] = value
+        self._index_base(base)
+
+    def _index_base(self, base: Union[bytes, bytearray]) -> None:
+        self.base = bytes(base)
+        view = FRUView(self.base)
+        self.spans: Dict[str, Tuple[int, int]] = {}
+        # area -> (checksum offset, sum of the fixed bytes, spans of the area)
+        self.areas: Dict[str, Tuple[int, int, List[Tuple[int, int]]]] = {}
+        for name in self.defaults:
+            area, full_field = FieldMapping[name].value[:2]
+            span = view.index(area).get(full_field)
+            # Same rules as FRU.patch_field: ASCII fields of two bytes or more
+            if span is None or span[1] < 2 or self.base[span[0] - 1] != 0xC0 | span[1]:
+                continue
+            self.spans[name] = span
+            if area not in self.areas:
+                area_offset = view.common_header[FRUView.AREA_HEADER[area]] * 8
+                sum_offset = area_offset + self.base[area_offset + 1] * 8 - 1
+                area_sum = sum(self.base[area_offset:sum_offset])
+                self.areas[area] = (sum_offset, area_sum, [])
+            sum_offset, area_sum, spans = self.areas[area]
+            area_sum -= sum(self.base[span[0] : span[0] + span[1]])
+            self.areas[area] = (sum_offset, area_sum, spans + [span])
+
+    def stamp(self, values: Dict[str, Any]) -> bytearray:
+        """Return the image of one unit; values are as for apply_fields()."""
+        values = {k: v for k, v in values.items() if v is not None and k != "File"}
+        # A "<name>-raw" value replaces the base value of name, as in a manifest
+        defaults = {k: v for k, v in self.defaults.items() if f"{k}-raw" not in values}
+        values = {**defaults, **values}
+        image = bytearray(self.base)
+        for name, value in values.items():
+            span = self.spans.get(name)
+            if (
+                span is None
+                or not isinstance(value, str)
+                or not value.isascii()
+                or len(value) != span[1]
+            ):
+                return self.rebuild(values)
+            image[span[0] : span[0] + span[1]] = value.encode("ascii")
+
+        for sum_offset, fixed_sum, spans in self.areas.values():
+            total = fixed_sum + sum(sum(image[o : o + n]) for o, n in spans)
+            image[sum_offset] = -total & 0xFF
+        return image
+
+    def rebuild(self, values: Dict[str, Any]) -> bytearray:
+        self.rebuilt += 1
+        fru = FRU(raw_data=bytearray(self.base))
+        fru.parse_bin(None)
+        apply_fields(fru, values)
+        if not fru.update_binary():
+            raise ValueError("failed to rebuild FRU binary")
+        # Every later unit sets all of these fields again, so the new image
+        # can serve as the base if nothing else was changed
+        if set(values) <= set(self.defaults):
+            self._index_base(fru.raw_data)
+        return fru.raw_data
+
+
+def stamp_units(
+    patterns: Dict[str, str], count: int, start: int = 1
+) -> Iterator[Dict[str, str]]:
+    """Unit values from str.format patterns of the unit number n, e.g. "SN{n:06d}"."""
+    for n in range(start, start + count):
+        yield {name: pattern.format(n=n) for name, pattern in patterns.items()}
+
+
+def write_stamped(
+    stamper: FRUStamper,
+    units: Iterable[Dict[str, Any]],
+    out: Path,
+    slot_size: Optional[int] = None,
+    name: str = "{n:06d}.bin",
+    start: int = 1,
+) -> int:
+    """Stamp every unit and write the images; return the number written.
+
+    Images go to directory out, one file per unit named by its "File"
+    value or by name (formatted with the unit number n and its values).
+    With slot_size, they are packed instead into the single file out, each
+    padded with 0xFF to slot_size bytes (the layout read by scan_corpus).
+    """
+    count = 0
+    if slot_size:
+        with out.open("wb", buffering=1 << 20) as f:
+            for count, unit in enumerate(units, 1):
+                image = stamper.stamp(unit)
+                if len(image) > slot_size:
+                    raise ValueError(
+                        f"unit {start + count - 1}: {len(image)}-byte image "
+                        f"exceeds the {slot_size}-byte slot"
+                    )
+                f.write(image)
+                f.write(b"\xff" * (slot_size - len(image)))
+        return count
+
+    out.mkdir(parents=True, exist_ok=True)
+    for count, unit in enumerate(units, 1):
+        values = {k: v for k, v in unit.items() if k != "File"}
+        filename = unit.get("File") or name.format(n=start + count - 1, **values)
+        with (out / filename).open("wb") as f:
+            f.write(stamper.stamp(unit))
+    return count
+
+
+def expand_fru_paths(
+    patterns: Iterable[Union[str, Path]], expand: bool = True
+) -> Iterator[Path]:
+    """Expand files, directories and glob patterns into FRU file paths.
+
+    With expand=False (a command line without -b), every pattern is taken
+    as one file name, as it is.
+    """
+    if not expand:
+        yield from map(Path, patterns)
+        return
+    for pattern in patterns:
+        path = Path(pattern)
+        if path.is_dir():
+            yield from sorted(p for p in path.iterdir() if p.is_file())
+        elif not path.exists() and any(c in str(pattern) for c in "*?["):
+            import glob
+
+            for name in sorted(glob.glob(str(pattern), recursive=True)):
+                if os.path.isfile(name):
+                    yield Path(name)
+        else:
+            yield path
+
+
+class ParseCache:
+    """On-disk cache of parsed FRU records, keyed by image content.
+
+    Records (as built by fru_to_dict) are stored in a SQLite file under the
+    SHA-256 of the tool version and the raw image, so an unchanged image is
+    served without parsing and a new release never reuses older results.
+    The least recently used entries are evicted once the stored records
+    exceed max_bytes. Hit and miss counts are kept in the file; several
+    processes may share one cache file.
+    """
+
+    def __init__(self, path: Union[str, Path], max_bytes: int = 64 << 20) -> None:
+        import sqlite3
+
+        self.max_bytes = max_bytes
+        # Hits only read the database; their recency updates and the hit and
+        # miss counts are buffered and written in batches by flush().
+        self.pending_used: Dict[str, float] = {}
+        self.pending_hits = 0
+        self.pending_misses = 0
+        self.db = sqlite3.connect(str(path), timeout=30, isolation_level=None)
+        self.db.execute("PRAGMA journal_mode=WAL")
+        self.db.execute("PRAGMA synchronous=NORMAL")
+        with self.transaction():
+            self.db.execute(
+                "CREATE TABLE IF NOT EXISTS entries (key TEXT PRIMARY KEY, "
+                "record TEXT NOT NULL, size INTEGER NOT NULL, used REAL NOT NULL)"
+            )
+            self.db.execute("CREATE INDEX IF NOT EXISTS entries_used ON entries(used)")
+            self.db.execute(
+                "CREATE TABLE IF NOT EXISTS stats "
+                "(name TEXT PRIMARY KEY, value INTEGER NOT NULL)"
+            )
+            self.db.executemany(
+                "INSERT OR IGNORE INTO stats VALUES (?, 0)",
+                [("hits",), ("misses",), ("bytes",)],
+            )
+
+    def transaction(self):
+        """Context manager for one write transaction, taken up front so that
+        concurrent writers wait for each other instead of failing."""
+        import contextlib
+
+        @contextlib.contextmanager
+        def write():
+            self.db.execute("BEGIN IMMEDIATE")
+            try:
+                yield
+            except BaseException:
+                self.db.execute("ROLLBACK")
+                raise
+            self.db.execute("COMMIT")
+
+        return write()
+
+    @staticmethod
+    def key(raw_data: Union[bytes, bytearray]) -> str:
+        import hashlib
+
+        digest = hashlib.sha256(__version__.encode())
+        digest.update(raw_data)
+        return digest.hexdigest()
+
+    def get(self, key: str) -> Optional[Dict[str, Any]]:
+        """Return the cached record for key, counting a hit or a miss."""
+        import time
+
+        row = self.db.execute(
+            "SELECT record FROM entries WHERE key = ?", (key,)
+        ).fetchone()
+        if row:
+            self.pending_used[key] = time.time()
+            self.pending_hits += 1
+        else:
+            self.pending_misses += 1
+        if len(self.pending_used) >= 256:
+            self.flush()
+        return json.loads(row[0]) if row else None
+
+    def put(self, key: str, record: Dict[str, Any]) -> None:
+        import time
+
+        text = json.dumps(record, cls=FRUEncoder)
+        with self.transaction():
+            added = self.db.execute(
+                "INSERT OR IGNORE INTO entries VALUES (?, ?, ?, ?)",
+                (key, text, len(text), time.time()),
+            ).rowcount
+            if added:
+                self.db.execute(
+                    "UPDATE stats SET value = value + ? WHERE name = 'bytes'",
+                    (len(text),),
+                )
+            self.write_pending()
+            self.evict()
+
+    def flush(self) -> None:
+        """Write the buffered recency updates and hit/miss counts."""
+        if self.pending_used or self.pending_hits or self.pending_misses:
+            with self.transaction():
+                self.write_pending()
+
+    def write_pending(self) -> None:
+        self.db.executemany(
+            "UPDATE entries SET used = ? WHERE key = ?",
+            [(used, key) for key, used in self.pending_used.items()],
+        )
+        self.db.executemany(
+            "UPDATE stats SET value = value + ? WHERE name = ?",
+            [(self.pending_hits, "hits"), (self.pending_misses, "misses")],
+        )
+        self.pending_used.clear()
+        self.pending_hits = self.pending_misses = 0
+
+    def evict(self) -> None:
+        """Drop least recently used entries until the cache fits max_bytes."""
+        (size,) = self.db.execute(
+            "SELECT value FROM stats WHERE name = 'bytes'"
+        ).fetchone()
+        while size > self.max_bytes:
+            oldest = self.db.execute(
+                "SELECT key, size FROM entries ORDER BY used LIMIT 64"
+            ).fetchall()
+            if not oldest:
+                break
+            for key, entry_size in oldest:
+                if size <= self.max_bytes:
+                    break
+                self.db.execute("DELETE FROM entries WHERE key = ?", (key,))
+                size -= entry_size
+        self.db.execute("UPDATE stats SET value = ? WHERE name = 'bytes'", (size,))
+
+    def parse(self, raw_data: Union[bytes, bytearray]) -> Dict[str, Any]:
+        """Return the fru_to_dict() record of an image, parsing only on a miss."""
+        key = self.key(raw_data)
+        record = self.get(key)
+        if record is None:
+            fru = FRU(raw_data=bytearray(raw_data))
+            fru.parse_bin(None)
+            record = fru_to_dict(fru)
+            self.put(key, record)
+        return record
+
+    def stats(self) -> Dict[str, Any]:
+        self.flush()
+        counts = dict(self.db.execute("SELECT name, value FROM stats"))
+        (entries,) = self.db.execute("SELECT COUNT(*) FROM entries").fetchone()
+        lookups = counts["hits"] + counts["misses"]
+        return {
+            "Entries": entries,
+            "Bytes": counts["bytes"],
+            "Max Bytes": self.max_bytes,
+            "Hits": counts["hits"],
+            "Misses": counts["misses"],
+            "Hit Rate": round(counts["hits"] / lookups, 4) if lookups else None,
+        }
+
+    def close(self) -> None:
+        self.flush()
+        self.db.close()
+
+
+# One ParseCache per process and cache file, shared by the pool workers'
+# calls to parse_record(). The process id is part of the key because forked
+# workers inherit this dict but must not share the parent's connection.
+_parse_caches: Dict[Tuple[int, str, int], ParseCache] = {}
+
+
+def open_parse_cache(path: Union[str, Path], max_bytes: int = 64 << 20) -> ParseCache:
+    key = (os.getpid(), str(path), max_bytes)
+    if key not in _parse_caches:
+        # multiprocessing finalizers also run when pool workers exit,
+        # where atexit handlers do not
+        from multiprocessing.util import Finalize
+
+        cache = _parse_caches[key] = ParseCache(path, max_bytes)
+        Finalize(cache, cache.close, exitpriority=10)
+    return _parse_caches[key]
+
+
+def parse_record(
+    path: Path,
+    partial_read: bool = False,
+    cache: Optional[Path] = None,
+    cache_max_bytes: int = 64 << 20,
+) -> Dict[str, Any]:
+    """Parse one FRU file into a JSON-serializable record, capturing errors.
+
+    With partial_read, only the header and info areas are read and the
+    record includes the number of bytes read. With cache, parse results are
+    looked up in and stored to that ParseCache file.
+    """
+    record: Dict[str, Any] = {"File": str(path)}
+    try:
+        fru = FRU()
+        if partial_read:
+            with path.open("rb") as f:
+                reader = FRUAreaReader(f)
+                fru.raw_data = reader.read_image()
+            record["Bytes Read"] = reader.bytes_read
+        elif cache is not None:
+            fru.raw_data = bytearray(path.read_bytes())
+        else:
+            fru.parse_bin(path)
+            record.update(fru_to_dict(fru))
+            return record
+
+        if cache is not None:
+            record.update(open_parse_cache(cache, cache_max_bytes).parse(fru.raw_data))
+        else:
+            fru.parse_bin(None)
+            record.update(fru_to_dict(fru))
+    except (OSError, ValueError, struct.error) as e:
+        record["Error"] = str(e)
+    return record
+
+
+def rebuild_record(path: Path) -> Dict[str, Any]:
+    """Parse and rebuild one FRU file, reporting whether the image round-trips."""
+    record: Dict[str, Any] = {"File": str(path)}
+    try:
+        fru = FRU()
+        fru.parse_bin(path)
+        original = bytes(fru.raw_data)
+        if not fru.rebuild_fru_binary():
+            raise ValueError("failed to rebuild FRU binary")
+    except (OSError, ValueError, struct.error) as e:
+        record["Error"] = str(e)
+        return record
+    record["Identical"] = fru.raw_data == original
+    return record
+
+
+def query_record(
+    fields: List[str], path: Path, partial_read: bool = False
+) -> Dict[str, Any]:
+    """Read selected FieldMapping fields of one FRU file without a full parse."""
+    record: Dict[str, Any] = {"File": str(path)}
+    try:
+        if partial_read:
+            view = FRUView(read_fru_file(path))
+        else:
+            view = FRUView.from_file(path)
+        record["Values"] = query_values(view, fields)
+    except (OSError, ValueError, struct.error) as e:
+        record["Error"] = str(e)
+    return record
+
+
+def query_values(view: FRUView, fields: List[str]) -> List[str]:
+    values = [view.get(name, "") for name in fields]
+    return [
+        v["date"] if isinstance(v, dict) and "date" in v else str(v) for v in values
+    ]
+
+
+def verify_record(path: Path, partial_read: bool = False) -> Dict[str, Any]:
+    """Verify the structure of one FRU file (see FRU.verify)."""
+    record: Dict[str, Any] = {"File": str(path)}
+    try:
+        if partial_read:
+            fru = FRU(raw_data=read_fru_file(path))
+        else:
+            fru = FRU(raw_data=bytearray(path.read_bytes()))
+        fru.common_header = list(fru.raw_data[:8])
+        findings = fru.verify()
+    except OSError as e:
+        record["Error"] = str(e)
+        return record
+    record["Valid"] = not findings
+    record["Findings"] = findings
+    return record
+
+
+def index_record(path: Path) -> Dict[str, Any]:
+    """Hash one FRU file and read every FieldMapping field, for FRUIndex."""
+    import hashlib
+
+    record: Dict[str, Any] = {"File": str(path)}
+    try:
+        data = path.read_bytes()
+        record["SHA256"] = hashlib.sha256(data).hexdigest()
+        fields = list(FieldMapping.__members__)
+        record["Values"] = dict(zip(fields, query_values(FRUView(data), fields)))
+    except (OSError, ValueError, struct.error) as e:
+        record["Error"] = str(e)
+    return record
+
+
+class FRUIndex:
+    """SQLite inventory of FRU images, searchable by FieldMapping fields.
+
+    update() ingests files, directories and glob patterns. Files whose size
+    and mtime are unchanged are not read again; changed files are re-read,
+    and their fields rewritten only if the content hash differs. Files that
+    no longer exist are dropped. find() answers lookups from the index
+    alone, without touching the images.
+    """
+
+    def __init__(self, path: Union[str, Path]) -> None:
+        import sqlite3
+
+        self.db = sqlite3.connect(str(path))
+        with self.db:
+            self.db.execute(
+                "CREATE TABLE IF NOT EXISTS files (path TEXT PRIMARY KEY, "
+                "size INTEGER NOT NULL, mtime_ns INTEGER NOT NULL, sha256 TEXT, "
+                "error TEXT)"
+            )
+            self.db.execute(
+                "CREATE TABLE IF NOT EXISTS fields (path TEXT NOT NULL, "
+                "field TEXT NOT NULL, value TEXT NOT NULL, PRIMARY KEY (path, field))"
+            )
+            self.db.execute(
+                "CREATE INDEX IF NOT EXISTS fields_value ON fields(field, value)"
+            )
+
+    def update(
+        self, patterns: Iterable[Union[str, Path]], jobs: int = 1
+    ) -> Dict[str, int]:
+        """Bring the index up to date with the given files; return counts."""
+        counts = dict.fromkeys(
+            ("Added", "Updated", "Unchanged", "Removed", "Errors"), 0
+        )
+        known = {
+            path: (size, mtime_ns, sha256)
+            for path, size, mtime_ns, sha256 in self.db.execute(
+                "SELECT path, size, mtime_ns, sha256 FROM files"
+            )
+        }
+
+        changed = []
+        for path in expand_fru_paths(patterns):
+            name = os.path.abspath(path)
+            try:
+                st = os.stat(name)
+            except OSError as e:
+                logger.error(f"{path}: {e}")
+                counts["Errors"] += 1
+                continue
+            if known.get(name, ())[:2] == (st.st_size, st.st_mtime_ns):
+                counts["Unchanged"] += 1
+            else:
+                changed.append((name, st))
+
+        paths = [Path(name) for name, _ in changed]
+        with self.db:
+            for (name, st), record in zip(changed, pool_map(index_record, paths, jobs)):
+                stat = (st.st_size, st.st_mtime_ns)
+                if "Error" in record:
+                    logger.error(f"{name}: {record['Error']}")
+                    counts["Errors"] += 1
+                elif name in known and known[name][2] == record["SHA256"]:
+                    self.db.execute(
+                        "UPDATE files SET size = ?, mtime_ns = ? WHERE path = ?",
+                        stat + (name,),
+                    )
+                    counts["Unchanged"] += 1
+                    continue
+                else:
+                    counts["Updated" if name in known else "Added"] += 1
+                self.db.execute(
+                    "INSERT OR REPLACE INTO files VALUES (?, ?, ?, ?, ?)",
+                    (name,) + stat + (record.get("SHA256"), record.get("Error")),
+                )
+                self.db.execute("DELETE FROM fields WHERE path = ?", (name,))
+                self.db.executemany(
+                    "INSERT INTO fields VALUES (?, ?, ?)",
+                    [
+                        (name, field, value)
+                        for field, value in record.get("Values", {}).items()
+                        if value
+                    ],
+                )
+
+            for name in known:
+                if not os.path.exists(name):
+                    self.db.execute("DELETE FROM files WHERE path = ?", (name,))
+                    self.db.execute("DELETE FROM fields WHERE path = ?", (name,))
+                    counts["Removed"] += 1
+        return counts
+
+    def find(self, criteria: Dict[str, str]) -> Iterator[Dict[str, Any]]:
+        """Yield {"File", "Values"} for indexed images matching every
+        FieldMapping name = value in criteria (glob patterns allowed in
+        values); with no criteria, yield every readable image."""
+        unknown = [name for name in criteria if name not in FieldMapping.__members__]
+        if unknown:
+            raise ValueError(f"Unknown field(s): {', '.join(unknown)}")
+
+        query = "SELECT path FROM files WHERE error IS NULL"
+        params: List[str] = []
+        for name, value in criteria.items():
+            op = "GLOB" if any(c in value for c in "*?[") else "="
+            query += (
+                " AND EXISTS (SELECT 1 FROM fields WHERE fields.path = files.path"
+                f" AND field = ? AND value {op} ?)"
+            )
+            params += [name, value]
+
+        order = {name: i for i, name in enumerate(FieldMapping.__members__)}
+        for (path,) in self.db.execute(query + " ORDER BY path", params).fetchall():
+            rows = self.db.execute(
+                "SELECT field, value FROM fields WHERE path = ?", (path,)
+            ).fetchall()
+            rows.sort(key=lambda row: order[row[0]])
+            yield {"File": path, "Values": dict(rows)}
+
+    def close(self) -> None:
+        self.db.close()
+
+
+def scan_image(image: Union[bytes, memoryview]) -> List[str]:
+    """Checksum problems of one image: the pure-Python path of scan_corpus()."""
+    problems = []
+    if sum(image[:8]) & 0xFF:
+        problems.append("header checksum")
+    for area_name, index in FRUView.AREA_HEADER.items():
+        offset = image[index] * 8
+        if not offset:
+            continue
+        length = image[offset + 1] * 8 if offset + 2 <= len(image) else 0
+        if length < 8 or offset + length > len(image):
+            problems.append(f"{area_name} length")
+        elif sum(image[offset : offset + length]) & 0xFF:
+            problems.append(f"{area_name} checksum")
+    return problems
+
+
+def scan_corpus(
+    filename: Path, slot_size: int, use_numpy: Optional[bool] = None
+) -> Iterator[Dict[str, Any]]:
+    """Check images packed back to back in fixed-size slots of one file.
+
+    Verifies the common header checksum and the length and checksum of each
+    info area (FRU.calculate_checksum semantics) and yields
+    {"Index", "Offset", "Problems"} for every bad image, in slot order.
+    The file is memory-mapped; with NumPy installed, slots are checked in
+    batches of array operations, otherwise one by one in Python.
+    """
+    if slot_size < 8:
+        raise ValueError(f"Slot size {slot_size} is smaller than the common header")
+
+    np = None
+    if use_numpy is not False:
+        try:
+            import numpy as np
+        except ImportError:
+            if use_numpy:
+                raise
+
+    if np is None:
+        import mmap
+
+        with filename.open("rb") as f:
+            if not os.fstat(f.fileno()).st_size:
+                return
+            with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as data:
+                for index in range(len(data) // slot_size):
+                    offset = index * slot_size
+                    problems = scan_image(data[offset : offset + slot_size])
+                    if problems:
+                        yield {"Index": index, "Offset": offset, "Problems": problems}
+        return
+
+    count = filename.stat().st_size // slot_size
+    if not count:
+        return
+    images = np.memmap(filename, dtype=np.uint8, mode="r", shape=(count, slot_size))
+    batch = max(1, (16 << 20) // slot_size)  # ~16 MiB of images per batch
+    for first in range(0, count, batch):
+        block = images[first : first + batch]
+        rows = np.arange(len(block))
+        # Flat copy with one spare byte so every span end is a valid index.
+        flat = np.zeros(block.size + 1, dtype=np.uint8)
+        flat[:-1] = block.reshape(-1)
+        base = rows * slot_size
+
+        spans = [(base, base + 8)]
+        areas = []
+        for area_name, index in FRUView.AREA_HEADER.items():
+            offset = block[:, index].astype(np.int64) * 8
+            present = offset != 0
+            length = block[rows, np.minimum(offset + 1, slot_size - 1)]
+            length = length.astype(np.int64) * 8  # uint8 * 8 would wrap
+            length[offset + 2 > slot_size] = 0
+            valid = (length >= 8) & (offset + length <= slot_size)
+            start = base + np.minimum(offset, slot_size)
+            spans.append((start, np.where(valid, start + length, start)))
+            areas.append((area_name, present, valid))
+
+        # One reduceat sums every span; entries for the gaps in between
+        # (and for empty spans) are ignored.
+        bounds = np.stack([edge for span in spans for edge in span], axis=1)
+        sums = np.add.reduceat(flat, bounds.reshape(-1), dtype=np.uint32)
+        sums = (sums[::2] & 0xFF).reshape(len(block), len(spans))
+
+        checks = [("header checksum", sums[:, 0] != 0)]
+        for column, (area_name, present, valid) in enumerate(areas, 1):
+            checks.append((f"{area_name} length", present & ~valid))
+            bad_sum = present & valid & (sums[:, column] != 0)
+            checks.append((f"{area_name} checksum", bad_sum))
+
+        bad = np.zeros(len(block), dtype=bool)
+        for _, failed in checks:
+            bad |= failed
+        for row in np.flatnonzero(bad):
+            index = first + int(row)
+            yield {
+                "Index": index,
+                "Offset": index * slot_size,
+                "Problems": [name for name, failed in checks if failed[row]],
+            }
+
+
+def map_fru_files(
+    worker: Callable[[Path], Dict[str, Any]],
+    patterns: Iterable[Union[str, Path]],
+    jobs: int = 1,
+    expand: bool = True,
+) -> Iterator[Dict[str, Any]]:
+    """Run worker over every FRU file, in input order, on up to jobs processes.
+
+    jobs=0 uses one process per CPU. The worker must be a module-level
+    function returning a record, so that it can be sent to the pool.
+    """
+    return pool_map(worker, list(expand_fru_paths(patterns, expand)), jobs)
+
+
+def pool_map(worker: Callable, items: List[Any], jobs: int = 1) -> Iterator[Any]:
+    jobs = jobs or os.cpu_count() or 1
+    if jobs == 1 or len(items) < 2:
+        yield from map(worker, items)
+        return
+
+    from concurrent.futures import ProcessPoolExecutor
+
+    chunksize = max(1, min(256, len(items) // (jobs * 4)))
+    with ProcessPoolExecutor(max_workers=jobs) as executor:
+        yield from executor.map(worker, items, chunksize=chunksize)
+
+
+def parse_files(
+    patterns: Iterable[Union[str, Path]],
+    jobs: int = 1,
+    partial_read: bool = False,
+    cache: Optional[Path] = None,
+    cache_max_bytes: int = 64 << 20,
+) -> Iterator[Dict[str, Any]]:
+    worker = parse_record
+    if partial_read or cache is not None:
+        worker = partial(
+            parse_record,
+            partial_read=partial_read,
+            cache=cache,
+            cache_max_bytes=cache_max_bytes,
+        )
+    return map_fru_files(worker, patterns, jobs)
+
+
+def rebuild_files(
+    patterns: Iterable[Union[str, Path]], jobs: int = 1
+) -> Iterator[Dict[str, Any]]:
+    return map_fru_files(rebuild_record, patterns, jobs)
+
+
+class FRUAreaReader:
+    """Reads a FRU image guided by its common header, counting what it reads.
+
+    Reads the 8-byte common header, then seeks to each info area it points
+    to and reads the area's length byte before reading exactly the rest of
+    the area; MultiRecord records are read header by header up to the
+    end-of-list record. The Internal Use area has no length and is skipped.
+    bytes_read and reads record the I/O actually performed.
+    """
+
+    def __init__(self, f: BinaryIO) -> None:
+        self.f = f
+        self.bytes_read = 0
+        self.reads = 0
+
+    def read_at(self, offset: int, size: int) -> bytes:
+        self.f.seek(offset)
+        data = self.f.read(size)
+        self.bytes_read += len(data)
+        self.reads += 1
+        return data
+
+    def read_image(self) -> bytearray:
+        """Return an image laid out as on the device, with zeros in the gaps
+        that were not read, so that FRU.parse_bin() can parse it as usual."""
+        image = bytearray(self.read_at(0, 8))
+        if len(image) < 8:
+            return image
+
+        for index in (2, 3, 4):  # Chassis, board and product info areas
+            offset = image[index] * 8
+            if not offset:
+                continue
+            area = self.read_at(offset, 2)  # Format version and area length
+            if len(area) == 2 and area[1]:
+                area += self.read_at(offset + 2, area[1] * 8 - 2)
+            self._place(image, offset, area)
+
+        offset = image[5] * 8  # MultiRecord area
+        while offset:
+            header = self.read_at(offset, 5)
+            if len(header) < 5:
+                break
+            record = header + self.read_at(offset + 5, header[2])
+            self._place(image, offset, record)
+            offset = 0 if header[1] & 0x80 else offset + len(record)
+        return image
+
+    @staticmethod
+    def _place(image: bytearray, offset: int, data: bytes) -> None:
+        if len(image) < offset + len(data):
+            image.extend(bytes(offset + len(data) - len(image)))
+        image[offset : offset + len(data)] = data
+
+
+def read_fru_areas(f: BinaryIO) -> bytearray:
+    """Read only the common header and the info areas it points to."""
+    return FRUAreaReader(f).read_image()
+
+
+def read_fru_file(path: Path) -> bytearray:
+    with path.open("rb") as f:
+        return read_fru_areas(f)
+
+
+def i2c_bus_key(path: Path) -> str:
+    """Group sysfs EEPROM paths by I2C bus, and other files by directory."""
+    for part in path.parts:
+        if part.startswith("i2c-") and part[4:].isdigit():
+            return part
+        bus, _, address = part.partition("-")
+        if bus.isdigit() and len(address) == 4:  # e.g. 12-0050
+            return f"i2c-{bus}"
+    return str(path.parent)
+
+
+async def parse_files_async(
+    patterns: Iterable[Union[str, Path]],
+    per_bus: int = 1,
+    bus_key: Callable[[Path], str] = i2c_bus_key,
+) -> AsyncIterator[Tuple[Path, Union[FRU, Exception]]]:
+    """Read and parse many FRU sources concurrently, yielding as they complete.
+
+    Sources sharing a bus_key() are read at most per_bus at a time. Only the
+    header and info areas are read (read_fru_areas), in the default executor.
+    Yields (path, FRU) pairs, or (path, exception) for sources that failed.
+    """
+    import asyncio
+
+    loop = asyncio.get_running_loop()
+    semaphores: Dict[str, asyncio.Semaphore] = {}
+
+    async def parse_one(path: Path) -> Tuple[Path, Union[FRU, Exception]]:
+        semaphore = semaphores.setdefault(bus_key(path), asyncio.Semaphore(per_bus))
+        try:
+            async with semaphore:
+                raw_data = await loop.run_in_executor(None, read_fru_file, path)
+            fru = FRU(raw_data=raw_data)
+            fru.parse_bin(None)
+        except (OSError, ValueError, struct.error) as e:
+            return path, e
+        return path, fru
+
+    tasks = [asyncio.ensure_future(parse_one(p)) for p in expand_fru_paths(patterns)]
+    try:
+        for task in asyncio.as_completed(tasks):
+            yield await task
+    finally:
+        for task in tasks:
+            task.cancel()
+
+
+def values_writer(delimiter: str = "\t") -> Callable[[List[str]], None]:
+    """Row writer shared by every -g output path (local, --index, --connect).
+
+    Values are quoted csv-style only when they contain the delimiter, a
+    quote or a newline; a row holding one empty value is an empty line
+    rather than csv's '""'.
+    """
+    import csv
+
+    writer = csv.writer(sys.stdout, delimiter=delimiter, lineterminator="\n")
+
+    def writerow(row: List[str]) -> None:
+        if len(row) == 1 and not row[0]:
+            sys.stdout.write("\n")
+        else:
+            writer.writerow(row)
+
+    return writerow
+
+
+def run_query(
+    patterns: Iterable[Union[str, Path]],
+    fields: List[str],
+    jobs: int = 1,
+    with_file: bool = False,
+    delimiter: str = "\t",
+    partial_read: bool = False,
+    expand: bool = True,
+) -> int:
+    writerow = values_writer(delimiter)
+    if with_file:
+        writerow(["File"] + fields)
+
+    failed = 0
+    worker = partial(query_record, fields, partial_read=partial_read)
+    for record in map_fru_files(worker, patterns, jobs, expand):
+        if "Error" in record:
+            failed += 1
+            logger.error(f"{record['File']}: {record['Error']}")
+            continue
+        writerow(([record["File"]] if with_file else []) + record["Values"])
+    return 1 if failed else 0
+
+
+def run_batch(
+    patterns: Iterable[Union[str, Path]],
+    jobs: int = 1,
+    partial_read: bool = False,
+    cache: Optional[Path] = None,
+    cache_max_bytes: int = 64 << 20,
+) -> int:
+    if cache is not None:
+        before = open_parse_cache(cache, cache_max_bytes).stats()
+    failed = 0
+    for record in parse_files(patterns, jobs, partial_read, cache, cache_max_bytes):
+        if "Error" in record:
+            failed += 1
+        sys.stdout.write(json.dumps(record, cls=FRUEncoder) + "\n")
+    if cache is not None:
+        after = open_parse_cache(cache, cache_max_bytes).stats()
+        logger.info(
+            f"Parse cache: {after['Hits'] - before['Hits']} hits, "
+            f"{after['Misses'] - before['Misses']} misses."
+        )
+    return 1 if failed else 0
+
+
+def run_verify(
+    patterns: Iterable[Union[str, Path]],
+    jobs: int = 1,
+    partial_read: bool = False,
+    expand: bool = True,
+) -> int:
+    failed = 0
+    worker = partial(verify_record, partial_read=partial_read)
+    for record in map_fru_files(worker, patterns, jobs, expand):
+        if not record.get("Valid"):
+            failed += 1
+        sys.stdout.write(json.dumps(record) + "\n")
+    return 1 if failed else 0
+
+
+def run_detail(
+    patterns: Iterable[Union[str, Path]],
+    fmt: str = "text",
+    with_file: bool = False,
+    expand: bool = True,
+) -> int:
+    """Stream the detailed dump of each file to stdout as text, CSV or JSONL."""
+    import csv
+
+    writer = csv.writer(sys.stdout, lineterminator="\n")
+    columns = ["Offset", "Value", "Description"]
+    if fmt == "csv":
+        writer.writerow((["File"] if with_file else []) + columns)
+
+    failed = 0
+    for path in expand_fru_paths(patterns, expand):
+        fru = FRU()
+        try:
+            fru.raw_data = bytearray(path.read_bytes())
+            rows = fru.iter_detail_rows()
+            next(rows)  # Title row
+        except (OSError, ValueError, struct.error) as e:
+            logger.error(f"{path}: {e}")
+            failed += 1
+            continue
+
+        if fmt == "text":
+            if with_file:
+                sys.stdout.write(f"==> {path} <==\n")
+            sys.stdout.write(f"{columns[0]:<10} {columns[1]:<24} {columns[2]}\n")
+        for row in rows:
+            if fmt == "text":
+                line = f"{row[0]:<10} {row[1]:<24} {row[2]}" if any(row) else ""
+                sys.stdout.write(line.rstrip() + "\n")
+            elif not any(row):  # Blank separator rows only lay out text
+                continue
+            elif fmt == "csv":
+                writer.writerow(([str(path)] if with_file else []) + row)
+            else:
+                record = dict(zip(columns, row))
+                if with_file:
+                    record = {"File": str(path), **record}
+                sys.stdout.write(json.dumps(record) + "\n")
+    return 1 if failed else 0
+
+
+def run_scan(filename: Path, slot_size: int) -> int:
+    bad = 0
+    for record in scan_corpus(filename, slot_size):
+        bad += 1
+        sys.stdout.write(json.dumps(record) + "\n")
+    count = filename.stat().st_size // slot_size
+    logger.info(f"Scanned {count} images, {bad} bad.")
+    return 1 if bad else 0
+
+
+def run_index(
+    index_file: Path,
+    patterns: Iterable[Union[str, Path]],
+    criteria: Optional[Dict[str, str]],
+    fields: Optional[List[str]] = None,
+    jobs: int = 1,
+    delimiter: str = "\t",
+) -> int:
+    index = FRUIndex(index_file)
+    failed = 0
+    if patterns:
+        counts = index.update(patterns, jobs)
+        failed = counts["Errors"]
+        logger.info(
+            f"Index {index_file}: "
+            + ", ".join(f"{n} {name.lower()}" for name, n in counts.items())
+            + "."
+        )
+
+    if criteria is not None:
+        if fields:
+            writerow = values_writer(delimiter)
+            writerow(["File"] + fields)
+        for record in index.find(criteria):
+            if fields:
+                values = record["Values"]
+                writerow([record["File"]] + [values.get(f, "") for f in fields])
+            else:
+                sys.stdout.write(json.dumps(record) + "\n")
+    index.close()
+    return 1 if failed else 0
+
+
+def read_manifest(filename: Path, require_file: bool = True) -> List[Dict[str, Any]]:
+    """Read manifest rows from a CSV or JSON Lines file.
+
+    Each row has a "File" column plus FieldMapping names (or "<name>-raw")
+    to set; empty CSV cells and JSON nulls leave the field unchanged.
+    Unless require_file is set, the "File" column is optional. Files are
+    read as UTF-8, with or without the byte-order mark Excel writes.
+    """
+    with filename.open(newline="", encoding="utf-8-sig") as f:
+        if filename.suffix.lower() in (".jsonl", ".json"):
+            rows = [json.loads(line) for line in f if line.strip()]
+        else:
+            import csv
+
+            rows = [
+                {k: v if v != "" else None for k, v in row.items()}
+                for row in csv.DictReader(f)
+            ]
+
+    allowed = {"File"}
+    allowed.update(field.name for field in FieldMapping)
+    allowed.update(f"{field.name}-raw" for field in FieldMapping)
+    for line, row in enumerate(rows, 1):
+        if require_file and not row.get("File"):
+            raise ValueError(f"{filename}: row {line} has no File")
+        unknown = set(row) - allowed
+        if unknown:
+            raise ValueError(
+                f"{filename}: row {line} has unknown field(s): "
+                f"{', '.join(sorted(unknown))}"
+            )
+    return rows
+
+
+def manifest_record(row: Dict[str, Any], diff_write: bool = False) -> Dict[str, Any]:
+    """Apply one manifest row to its FRU file, creating the file if needed."""
+    path = Path(row["File"])
+    record: Dict[str, Any] = {"File": str(path)}
+    try:
+        new_file = not path.exists()
+        fru = open_fru(path, create=True)
+        if not apply_fields(fru, row, new_file):
+            raise ValueError("no modifications specified")
+        if not fru.update_binary():
+            raise ValueError("failed to rebuild FRU binary")
+        if diff_write:
+            record["Bytes Written"] = fru.write_changes(path)
+        else:
+            fru.write_bin(path)
+            record["Bytes Written"] = len(fru.raw_data)
+    except (OSError, ValueError, struct.error) as e:
+        record["Error"] = str(e)
+    return record
+
+
+def manifest_records(
+    rows: List[Dict[str, Any]], diff_write: bool = False
+) -> List[Dict[str, Any]]:
+    """Apply manifest rows that name the same file, one after the other."""
+    return [manifest_record(row, diff_write) for row in rows]
+
+
+def run_manifest(filename: Path, jobs: int = 1, diff_write: bool = False) -> int:
+    try:
+        rows = read_manifest(filename)
+    except (OSError, ValueError) as e:
+        logger.error(f"Invalid manifest: {e}")
+        return 1
+
+    # Rows naming the same file go to one worker in manifest order, so that
+    # no worker reads a file while another one is rewriting it
+    groups: Dict[str, List[Dict[str, Any]]] = {}
+    for row in rows:
+        groups.setdefault(os.path.realpath(row["File"]), []).append(row)
+
+    failed = 0
+    written = 0
+    worker = partial(manifest_records, diff_write=diff_write)
+    for records in pool_map(worker, list(groups.values()), jobs):
+        for record in records:
+            if "Error" in record:
+                failed += 1
+                logger.error(f"{record['File']}: {record['Error']}")
+            else:
+                written += record["Bytes Written"]
+    print(
+        f"Manifest applied: {len(rows) - failed} succeeded, {failed} failed, "
+        f"{written} bytes written."
+    )
+    return 1 if failed else 0
+
+
+def run_stamp(
+    base_file: Path,
+    out: Path,
+    patterns: Dict[str, str],
+    count: int = 0,
+    start: int = 1,
+    stamp_list: Optional[Path] = None,
+    slot_size: Optional[int] = None,
+    name: str = "{n:06d}.bin",
+) -> int:
+    try:
+        if stamp_list:
+            units = read_manifest(stamp_list, require_file=False)
+            fields = {k for row in units for k in row if k != "File"}
+        else:
+            units = stamp_units(patterns, count, start)
+            fields = set(patterns)
+        stamper = FRUStamper(base_file.read_bytes(), fields)
+        written = write_stamped(stamper, units, out, slot_size, name, start)
+    except (OSError, ValueError, KeyError, IndexError, struct.error) as e:
+        logger.error(f"Stamping failed: {e}")
+        return 1
+    print(
+        f"Stamped {written} images into {out} "
+        f"({written - stamper.rebuilt} patched, {stamper.rebuilt} rebuilt)."
+    )
+    return 0
+
+
+def handle_request(request: Dict[str, Any]) -> Dict[str, Any]:
+    """Serve one JSON request of the --serve protocol.
+
+    Requests name an image by either "file" (a path on the server) or "data"
+    (base64). Supported "op" values:
+      parse    -> the JSON of a plain read
+      get      -> {"Values": [...]} for FieldMapping names in "fields"
+      modify   -> apply "fields" ({name or name-raw: value}) and write "file"
+                  (which is required)
+      rebuild  -> apply optional "fields" and return the image as "data"
+      version  -> {"version": ...}
+    Every response has "ok"; failures carry "error" instead of a result.
+    """
+    import base64
+
+    op = request.get("op")
+    try:
+        if op == "version":
+            return {"ok": True, "version": __version__}
+        if op not in ("parse", "get", "modify", "rebuild"):
+            raise ValueError(f"unknown op: {op!r}")
+
+        new_file = False
+        create = op in ("modify", "rebuild")
+        if ("file" in request) == ("data" in request):
+            raise ValueError("request needs either a file or data")
+        if op == "modify" and "file" not in request:
+            raise ValueError("modify needs a file (use rebuild for data)")
+        if op == "get":
+            fields = request.get("fields")
+            if not isinstance(fields, list) or not all(
+                isinstance(name, str) for name in fields
+            ):
+                raise ValueError("get needs a list of field names in fields")
+        if "data" in request:
+            raw_data = base64.b64decode(request["data"])
+            if op == "get":
+                view = FRUView(raw_data)
+            elif raw_data or not create:
+                fru = FRU(raw_data=bytearray(raw_data))
+                fru.parse_bin(None)
+            else:
+                fru, new_file = FRU(common_header=[0x01] + [0x00] * 7), True
+        else:
+            path = Path(request["file"])
+            if op == "get":
+                view = FRUView.from_file(path)
+            else:
+                new_file = create and not path.exists()
+                fru = open_fru(path, create=create)
+
+        if op == "parse":
+            return {"ok": True, **fru_to_dict(fru)}
+        if op == "get":
+            return {"ok": True, "Values": query_values(view, request["fields"])}
+
+        fields = request.get("fields") or {}
+        if not isinstance(fields, dict):
+            raise ValueError(f"{op} needs an object of field values in fields")
+        if apply_fields(fru, fields, new_file):
+            if not fru.update_binary():
+                raise ValueError("failed to rebuild FRU binary")
+        elif op == "modify":
+            raise ValueError("no modifications specified")
+        elif not fru.rebuild_fru_binary():
+            raise ValueError("failed to rebuild FRU binary")
+
+        if op == "rebuild":
+            return {"ok": True, "data": base64.b64encode(fru.raw_data).decode()}
+        if request.get("diff_write"):
+            written = fru.write_changes(path)
+        else:
+            fru.write_bin(path)
+            written = len(fru.raw_data)
+        return {"ok": True, "File": str(path), "Bytes Written": written}
+    except (OSError, ValueError, KeyError, TypeError, struct.error) as e:
+        return {"ok": False, "error": str(e)}
+
+
+def serve(socket_path: Path) -> int:
+    """Answer JSON Lines requests (see handle_request) on a Unix socket."""
+    import signal
+    import socketserver
+
+    class Handler(socketserver.StreamRequestHandler):
+        def handle(self):
+            for line in self.rfile:
+                if not line.strip():
+                    continue
+                try:
+                    request = json.loads(line)
+                    if not isinstance(request, dict):
+                        raise ValueError("not a JSON object")
+                except ValueError as e:
+                    response = {"ok": False, "error": f"invalid request: {e}"}
+                else:
+                    try:
+                        response = handle_request(request)
+                    except Exception as e:  # Keep the connection answering
+                        logger.exception(f"Request failed: {request.get('op')!r}")
+                        response = {"ok": False, "error": f"internal error: {e}"}
+                self.wfile.write(json.dumps(response, cls=FRUEncoder).encode() + b"\n")
+                self.wfile.flush()
+
+    if socket_path.is_socket():
+        socket_path.unlink()  # Left behind by a previous server
+    server = socketserver.ThreadingUnixStreamServer(str(socket_path), Handler)
+    server.daemon_threads = True
+    signal.signal(signal.SIGTERM, lambda signum, frame: sys.exit(0))
+    logger.info(f"fruid-util {__version__} serving on {socket_path}")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.server_close()
+        socket_path.unlink()
+    return 0
+
+
+def request_server(socket_path: Path, request: Dict[str, Any]) -> Dict[str, Any]:
+    """Send one request to a --serve process and return its response."""
+    import socket
+
+    with socket.socket(socket.AF_UNIX, socket.SOCK_STREAM) as sock:
+        sock.connect(str(socket_path))
+        sock.sendall(json.dumps(request).encode() + b"\n")
+        sock.shutdown(socket.SHUT_WR)
+        with sock.makefile("rb") as f:
+            return json.loads(f.readline())
+
+
+def fast_main(argv: List[str]) -> Optional[int]:
+    """Handle "fru_file [-g FIELDS] [--csv] [--partial-read]" without argparse.
+
+    Returns None for any other command line, which then goes through the
+    full option table built by build_parser().
+    """
+    files, fields, delimiter, partial_read = [], None, "\t", False
+    args = iter(argv)
+    for arg in args:
+        if arg in ("-g", "--get"):
+            fields = next(args, None)
+            if fields is None:
+                return None
+        elif arg.startswith("--get="):
+            fields = arg[len("--get=") :]
+        elif arg == "--csv":
+            delimiter = ","
+        elif arg == "--partial-read":
+            partial_read = True
+        elif arg.startswith("-") or files:
+            return None
+        else:
+            files.append(arg)
+
+    if len(files) != 1:
+        return None
+    if fields is None:
+        if delimiter != "\t":
+            return None
+        fru = open_fru(Path(files[0]), partial_read=partial_read)
+        print(json.dumps(fru_to_dict(fru), indent=2, cls=FRUEncoder))
+        return 0
+
+    names = [name.strip() for name in fields.split(",") if name.strip()]
+    if not names or any(name not in FieldMapping.__members__ for name in names):
+        return None  # Let argparse report the error
+    return run_query(
+        files, names, delimiter=delimiter, partial_read=partial_read, expand=False
+    )
+
+
+def build_parser():
+    import argparse
+
+    parser = argparse.ArgumentParser(
+        description="FRU Data Parser, Modifier, and Formatter",
+        usage="python3 %(prog)s fru_file [fru_file ...] [-h] [-v] [-b] [-j N] [-g FIELDS] [--csv] [--verify] [--detail {text,csv,jsonl}] [--scan SLOT_SIZE] [--partial-read] [--index DB] [--find FIELD=VALUE] [--cache FILE] [--cache-max-mb N] [--cache-stats] [-m] [--diff-write] [--manifest FILE] [--stamp OUT] [--count N] [--start N] [--stamp-list FILE] [--stamp-name PATTERN] [--slot-size N] [--serve SOCKET] [--connect SOCKET] [-f OUTPUT_FILE] [field options]",
+    )
+
+    parser.add_argument(
+        "fru_file",
+        nargs="*",
+        type=Path,
+        help="path to the FRU file (with -b: files, directories or glob patterns)",
+    )
+    parser.add_argument(
+        "-v", "--version", action="version", version=f"fruid-util {__version__}"
+    )
+    parser.add_argument("-m", "--modify", action="store_true", help="modify fields")
+    parser.add_argument(
+        "-b",
+        "--batch",
+        action="store_true",
+        help="parse many FRU files and output one JSON line per file",
+    )
+    parser.add_argument(
+        "-j",
+        "--jobs",
+        type=int,
+        default=1,
+        metavar="N",
+        help="with -b or --manifest, use N processes (0: one per CPU)",
+    )
+    parser.add_argument(
+        "--diff-write",
+        action="store_true",
+        help="with -m or --manifest, write only changed bytes (no truncation)",
+    )
+    parser.add_argument(
+        "--manifest",
+        type=Path,
+        metavar="FILE",
+        help="apply per-file field edits from a CSV or JSON Lines manifest",
+    )
+    parser.add_argument(
+        "--stamp",
+        type=Path,
+        metavar="OUT",
+        help="write unit images stamped from fru_file into directory OUT; field "
+        "options are patterns of the unit number, e.g. --BSN 'SN{n:06d}'",
+    )
+    parser.add_argument(
+        "--count", type=int, default=0, metavar="N", help="with --stamp, N units"
+    )
+    parser.add_argument(
+        "--start",
+        type=int,
+        default=1,
+        metavar="N",
+        help="with --stamp, number of the first unit (default: 1)",
+    )
+    parser.add_argument(
+        "--stamp-list",
+        type=Path,
+        metavar="FILE",
+        help="with --stamp, take unit values from a CSV or JSON Lines file "
+        "(field columns, optional File) instead of patterns",
+    )
+    parser.add_argument(
+        "--stamp-name",
+        default="{n:06d}.bin",
+        metavar="PATTERN",
+        help="with --stamp, file name pattern of the unit number n and fields "
+        "(default: {n:06d}.bin)",
+    )
+    parser.add_argument(
+        "--slot-size",
+        type=int,
+        metavar="N",
+        help="with --stamp, pack the images into the single file OUT in N-byte "
+        "slots (see --scan)",
+    )
+    parser.add_argument(
+        "-g",
+        "--get",
+        metavar="FIELDS",
+        help="print only the comma-separated fields (e.g. BSN,PSN,BMD), tab-separated",
+    )
+    parser.add_argument(
+        "--csv", action="store_true", help="with -g, print comma-separated values"
+    )
+    parser.add_argument(
+        "--verify",
+        action="store_true",
+        help="check headers, lengths, fields and checksums; print JSON findings",
+    )
+    parser.add_argument(
+        "--detail",
+        choices=["text", "csv", "jsonl"],
+        help="print the byte-level layout (offset, value, description) of fru_file",
+    )
+    parser.add_argument(
+        "--scan",
+        type=int,
+        metavar="SLOT_SIZE",
+        help="check checksums of every image packed in SLOT_SIZE slots of fru_file",
+    )
+    parser.add_argument(
+        "--partial-read",
+        action="store_true",
+        help="read only the common header and the info areas it points to",
+    )
+    parser.add_argument(
+        "--index",
+        type=Path,
+        metavar="DB",
+        help="add fru_file paths (files, directories or globs) to the inventory DB",
+    )
+    parser.add_argument(
+        "--find",
+        action="append",
+        metavar="FIELD=VALUE",
+        help="with --index, list indexed images whose field matches (repeatable, "
+        "globs allowed, e.g. BPN=ABC*; '' lists all)",
+    )
+    parser.add_argument(
+        "--cache",
+        type=Path,
+        metavar="FILE",
+        help="with -b, reuse parse results stored in FILE (created if missing)",
+    )
+    parser.add_argument(
+        "--cache-max-mb",
+        type=int,
+        default=64,
+        metavar="N",
+        help="evict least recently used cache entries beyond N MiB (default: 64)",
+    )
+    parser.add_argument(
+        "--cache-stats",
+        action="store_true",
+        help="print entry count, size, hits and misses of the --cache FILE",
+    )
+    parser.add_argument(
+        "--serve",
+        type=Path,
+        metavar="SOCKET",
+        help="serve parse/get/modify/rebuild JSON requests on a Unix socket",
+    )
+    parser.add_argument(
+        "--connect",
+        type=Path,
+        metavar="SOCKET",
+        help="send this read, -g or -m request to a --serve process",
+    )
+    parser.add_argument(
+        "-f",
+        "--format",
+        type=Path,
+        metavar="",
+        help="output in Excel xlsx format to specified file",
+    )
+
+    field_opt = parser.add_argument_group("field options")
+    for field in FieldMapping:
+        field_opt.add_argument(f"--{field.name}", help=f"modify {field.value[1]}")
+        field_opt.add_argument(f"--{field.name}-raw", help=argparse.SUPPRESS)
+
+    return parser
+
+
+def run_client(args) -> int:
+    request: Dict[str, Any] = {"file": str(args.fru_file[0].resolve())}
+    if args.get:
+        request["op"] = "get"
+        request["fields"] = [n.strip() for n in args.get.split(",") if n.strip()]
+    elif args.modify:
+        request["op"] = "modify"
+        request["diff_write"] = args.diff_write
+        request["fields"] = {}
+        for field in FieldMapping:
+            for key, value in (
+                (field.name, getattr(args, field.name)),
+                (f"{field.name}-raw", getattr(args, f"{field.name}_raw")),
+            ):
+                if value is not None:
+                    request["fields"][key] = value
+    else:
+        request["op"] = "parse"
+
+    try:
+        response = request_server(args.connect, request)
+    except (OSError, ValueError) as e:
+        logger.error(f"No answer from {args.connect}: {e}")
+        return 1
+    if not response.pop("ok"):
+        logger.error(response["error"])
+        return 1
+    if args.get:
+        values_writer("," if args.csv else "\t")(response["Values"])
+    elif args.modify:
+        print(
+            f"FRU data has been updated and written to {response['File']} "
+            f"({response['Bytes Written']} bytes written)."
+        )
+    else:
+        print(json.dumps(response, indent=2))
+    return 0
+
+
+def main():
+    result = fast_main(sys.argv[1:])
+    if result is not None:
+        return result
+
+    parser = build_parser()
+    args = parser.parse_args()
+
+    if args.serve:
+        return serve(args.serve)
+    if args.connect:
+        # run_client() sends a read, -g or -m request; refuse everything else
+        # rather than silently answering with a plain read
+        allowed = {"fru_file", "connect", "get", "csv", "modify", "diff_write"}
+        allowed.update(field.name for field in FieldMapping)
+        allowed.update(f"{field.name}_raw" for field in FieldMapping)
+        others = [
+            "--" + dest.replace("_", "-")
+            for dest, value in vars(args).items()
+            if dest not in allowed and value != parser.get_default(dest)
+        ]
+        if others:
+            parser.error(f"--connect cannot be combined with {', '.join(others)}")
+        if len(args.fru_file) != 1:
+            parser.error("--connect takes one fru_file")
+        if args.get and args.modify:
+            parser.error("-g/--get cannot be combined with -m")
+        return run_client(args)
+
+    if args.cache_stats:
+        if not args.cache:
+            parser.error("--cache-stats requires --cache FILE")
+        cache = ParseCache(args.cache, args.cache_max_mb << 20)
+        print(json.dumps(cache.stats(), indent=2))
+        return 0
+    if args.cache and (not args.batch or args.get or args.verify):
+        parser.error("--cache requires -b/--batch and cannot be combined with -g")
+
+    if args.find and not args.index:
+        parser.error("--find requires --index DB")
+    if args.index:
+        if args.modify or args.format or args.manifest or args.verify:
+            parser.error(
+                "--index cannot be combined with -m, -f, --manifest or --verify"
+            )
+        if not args.fru_file and not args.find:
+            parser.error("--index requires fru_file paths to add or --find")
+        criteria = None
+        if args.find:
+            criteria = {}
+            for item in filter(None, args.find):
+                name, sep, value = item.partition("=")
+                if not sep or name not in FieldMapping.__members__:
+                    parser.error(f"--find expects FIELD=VALUE, got {item}")
+                criteria[name] = value
+        fields = None
+        if args.get:
+            fields = [name.strip() for name in args.get.split(",") if name.strip()]
+            unknown = [name for name in fields if name not in FieldMapping.__members__]
+            if unknown:
+                parser.error(f"unknown field(s) for -g/--get: {', '.join(unknown)}")
+        return run_index(
+            args.index,
+            args.fru_file,
+            criteria,
+            fields,
+            args.jobs,
+            delimiter="," if args.csv else "\t",
+        )
+
+    if args.partial_read and (args.modify or args.manifest or args.format):
+        parser.error("--partial-read cannot be combined with -m, --manifest or -f")
+
+    if args.stamp:
+        if len(args.fru_file) != 1 or args.batch or args.modify or args.get:
+            parser.error("--stamp takes one base fru_file and no -b, -m or -g")
+        patterns = {}
+        for field in FieldMapping:
+            if getattr(args, field.name) is not None:
+                patterns[field.name] = getattr(args, field.name)
+            if getattr(args, f"{field.name}_raw") is not None:
+                patterns[f"{field.name}-raw"] = getattr(args, f"{field.name}_raw")
+        if bool(args.stamp_list) == bool(patterns):
+            parser.error("--stamp needs either field patterns or --stamp-list")
+        if patterns and args.count < 1:
+            parser.error("--stamp with field patterns needs --count N")
+        return run_stamp(
+            args.fru_file[0],
+            args.stamp,
+            patterns,
+            args.count,
+            args.start,
+            args.stamp_list,
+            args.slot_size,
+            args.stamp_name,
+        )
+
+    if args.manifest:
+        if args.fru_file or args.get or args.batch:
+            parser.error(
+                "--manifest takes no fru_file and cannot be combined with -g or -b"
+            )
+        return run_manifest(args.manifest, args.jobs, args.diff_write)
+    if not args.fru_file:
+        parser.error("the following arguments are required: fru_file")
+
+    if args.scan is not None:
+        if args.scan < 8:
+            parser.error("--scan slot size must be at least 8")
+        if len(args.fru_file) != 1 or args.batch or args.modify or args.get:
+            parser.error("--scan takes one corpus file and no -b, -m or -g")
+        return run_scan(args.fru_file[0], args.scan)
+
+    if args.detail:
+        if args.modify or args.format or args.get or args.verify:
+            parser.error("--detail cannot be combined with -m, -f, -g or --verify")
+        if not args.batch and len(args.fru_file) > 1:
+            parser.error("multiple FRU files require -b/--batch")
+        return run_detail(
+            args.fru_file, args.detail, with_file=args.batch, expand=args.batch
+        )
+
+    if args.verify:
+        if args.modify or args.format or args.get:
+            parser.error("--verify cannot be combined with -m, -f or -g")
+        if not args.batch and len(args.fru_file) > 1:
+            parser.error("multiple FRU files require -b/--batch")
+        return run_verify(
+            args.fru_file, args.jobs, args.partial_read, expand=args.batch
+        )
+
+    if args.get:
+        if args.modify or args.format:
+            parser.error("-g/--get cannot be combined with -m or -f")
+        fields = [name.strip() for name in args.get.split(",") if name.strip()]
+        unknown = [name for name in fields if name not in FieldMapping.__members__]
+        if unknown:
+            parser.error(f"unknown field(s) for -g/--get: {', '.join(unknown)}")
+        if not args.batch and len(args.fru_file) > 1:
+            parser.error("multiple FRU files require -b/--batch")
+        return run_query(
+            args.fru_file,
+            fields,
+            args.jobs if args.batch else 1,
+            with_file=args.batch,
+            delimiter="," if args.csv else "\t",
+            partial_read=args.partial_read,
+            expand=args.batch,
+        )
+
+    if args.batch:
+        if args.modify or args.format:
+            parser.error("-b/--batch cannot be combined with -m or -f")
+        return run_batch(
+            args.fru_file,
+            args.jobs,
+            args.partial_read,
+            args.cache,
+            args.cache_max_mb << 20,
+        )
+    if len(args.fru_file) > 1:
+        parser.error("multiple FRU files require -b/--batch")
+    args.fru_file = args.fru_file[0]
+
+    new_file = args.modify and not args.fru_file.exists()
+    if new_file:
+        print(f"FRU file {args.fru_file} does not exist. Creating a new file.")
+    fru = open_fru(args.fru_file, create=args.modify, partial_read=args.partial_read)
+
+    if args.modify:
+        values = {}
+        for field in FieldMapping:
+            values[field.name] = getattr(args, field.name)
+            values[f"{field.name}-raw"] = getattr(args, f"{field.name}_raw")
+
+        if apply_fields(fru, values, new_file):
+            if not fru.update_binary():
+                print("Failed to rebuild FRU binary due to errors.")
+                return 1
+
+            if args.diff_write:
+                written = fru.write_changes(args.fru_file)
+                print(
+                    f"FRU data has been updated and written to {args.fru_file} "
+                    f"({written} bytes written)."
+                )
+            else:
+                fru.write_bin(args.fru_file)
+                print(f"FRU data has been updated and written to {args.fru_file}.")
+        else:
+            logger.warning("No modifications specified.")
+
+    if args.format:
+        fru.export_excel(args.format)
+        print(f"Excel data written to {args.format}")
+
+    if args.format or args.modify:
+        return 0
+
+    print(json.dumps(fru_to_dict(fru), indent=2, cls=FRUEncoder))
+    return 0
+
@@ -0,0 +1,89 @@
+"""Shared helpers and fixtures for the fruid-util tests."""
+
+import importlib.util
+import subprocess
+import sys
+import tempfile
+import unittest
+from pathlib import Path
+
+import fruid_util as util
+
+UTIL_PATH = Path(__file__).resolve().parent.parent / "fruid-util.py"
+GEN_PATH = UTIL_PATH.with_name("fruid-gen.py")
+
+
+def load_script(name, path):
+    """Import a script whose file name is not a valid module name."""
+    spec = importlib.util.spec_from_file_location(name, str(path))
+    module = importlib.util.module_from_spec(spec)
+    sys.modules[name] = module
+    spec.loader.exec_module(module)
+    return module
+
+
+def run_util(*args):
+    """Run fruid-util.py as a script; returns the CompletedProcess."""
+    command = [sys.executable, str(UTIL_PATH), *map(str, args)]
+    return subprocess.run(command, capture_output=True, text=True)
+
+
+def load_fruid_gen():
+    """Import fruid-gen.py (needs openpyxl) as ``fruid_gen``."""
+    return load_script("fruid_gen", GEN_PATH)
+
+
+SAMPLE_VALUES = {
+    "CPN": "CHASSIS-PN-0001",
+    "CSN": "CHASSIS-SN-0001",
+    "BM": "Manufacturer",
+    "BP": "Example Board",
+    "BSN": "BSN000000000001",
+    "BPN": "BPN-0001",
+    "BFI": "FRU v0.01",
+    "PM": "Manufacturer",
+    "PN": "Example Product",
+    "PPN": "PPN-0001",
+    "PV": "A01",
+    "PSN": "PSN000000000001",
+    "PAT": "ASSET-0001",
+    "PFI": "FRU v0.01",
+}
+
+
+def make_sample_image(custom_fields=6):
+    """Build a FRU image with all three info areas populated."""
+    fru = util.FRU()
+    fru.common_header = [0x01, 0x00, 0x00, 0x00, 0x00, 0x00, 0x00, 0x00]
+    values = dict(SAMPLE_VALUES)
+    for prefix in ("CCD", "BCD", "PCD"):
+        for i in range(1, custom_fields + 1):
+            values[f"{prefix}{i}"] = f"{prefix} custom value {i}"
+    for name, value in values.items():
+        fru.modify_field(name, value)
+    fru.modify_field("BMD", "2025-01-01 00:00:00")
+    if not fru.rebuild_fru_binary():
+        raise RuntimeError("failed to build sample image")
+    return bytes(fru.raw_data)
+
+
+def parse_image(data):
+    fru = util.FRU(raw_data=bytearray(data))
+    fru.parse_bin(None)
+    return fru
+
+
+class FRUTestCase(unittest.TestCase):
+    """Gives every test a temporary directory and a sample image."""
+
+    def setUp(self):
+        tmp = tempfile.TemporaryDirectory()
+        self.addCleanup(tmp.cleanup)
+        self.dir = Path(tmp.name)
+        self.image = make_sample_image()
+
+    def write(self, name, data=None):
+        """Write data (default: the sample image) to name in the directory."""
+        path = self.dir / name
+        path.write_bytes(self.image if data is None else data)
+        return path
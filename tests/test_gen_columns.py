@@ -0,0 +1,55 @@
+import unittest
+import zipfile
+
+from tests.common import FRUTestCase
+
+try:
+    import openpyxl
+except ImportError:
+    openpyxl = None
+
+if openpyxl is not None:
+    from tests.common import load_fruid_gen
+
+    gen = load_fruid_gen()
+
+
+@unittest.skipIf(openpyxl is None, "needs openpyxl")
+class HiddenColumnsTest(FRUTestCase):
+    def test_hidden_columns_of_the_active_sheet(self):
+        wb = openpyxl.Workbook()
+        notes = wb.active
+        notes.title = "notes"
+        notes.column_dimensions["B"].hidden = True
+        sheet = wb.create_sheet("FRU & boards")
+        sheet.column_dimensions["C"].hidden = True
+        sheet.column_dimensions.group("E", "F", hidden=True)
+        for column in "ABCDEF":
+            sheet[f"{column}1"] = f"board {column}" if column != "A" else None
+            sheet[f"{column}2"] = "BSN" if column == "A" else f"SN-{column}"
+        wb.active = 1
+        path = self.dir / "boards.xlsx"
+        wb.save(path)
+
+        self.assertEqual(gen.hidden_columns(path, "FRU & boards"), {"C", "E", "F"})
+        self.assertEqual(gen.hidden_columns(path, "notes"), {"B"})
+        self.assertEqual(
+            gen.read_fru_columns(path), {"B": {"BSN": "SN-B"}, "D": {"BSN": "SN-D"}}
+        )
+
+    def test_not_a_workbook(self):
+        path = self.dir / "empty.xlsx"
+        with zipfile.ZipFile(path, "w") as archive:
+            archive.writestr("readme.txt", "")
+        with self.assertRaisesRegex(ValueError, "cannot locate the XML"):
+            gen.hidden_columns(path, "Sheet")
+
+    def test_unknown_sheet(self):
+        path = self.dir / "boards.xlsx"
+        openpyxl.Workbook().save(path)
+        with self.assertRaisesRegex(ValueError, "worksheet 'fru'"):
+            gen.hidden_columns(path, "fru")
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,156 @@
+import base64
+import subprocess
+import sys
+import time
+import unittest
+
+from tests.common import UTIL_PATH, FRUTestCase, run_util, util
+
+
+class HandleRequestTest(FRUTestCase):
+    def setUp(self):
+        super().setUp()
+        self.path = self.write("fru.bin")
+        self.data = base64.b64encode(self.image).decode()
+
+    def test_version(self):
+        response = util.handle_request({"op": "version"})
+        self.assertEqual(response, {"ok": True, "version": util.__version__})
+
+    def test_unknown_op(self):
+        response = util.handle_request({"op": "erase", "file": str(self.path)})
+        self.assertFalse(response["ok"])
+        self.assertIn("unknown op", response["error"])
+
+    def test_parse(self):
+        response = util.handle_request({"op": "parse", "data": self.data})
+        self.assertTrue(response["ok"])
+        self.assertEqual(response["Board Info"]["Board Serial"], "BSN000000000001")
+
+    def test_get(self):
+        response = util.handle_request(
+            {"op": "get", "file": str(self.path), "fields": ["BSN", "PAT"]}
+        )
+        self.assertEqual(
+            response, {"ok": True, "Values": ["BSN000000000001", "ASSET-0001"]}
+        )
+
+    def test_modify_writes_the_file(self):
+        response = util.handle_request(
+            {"op": "modify", "file": str(self.path), "fields": {"BSN": "SN0002"}}
+        )
+        written = self.path.stat().st_size
+        self.assertEqual(
+            response, {"ok": True, "File": str(self.path), "Bytes Written": written}
+        )
+        self.assertEqual(util.FRUView.from_file(self.path)["BSN"], "SN0002")
+
+    def test_modify_diff_write(self):
+        response = util.handle_request(
+            {
+                "op": "modify",
+                "file": str(self.path),
+                "fields": {"PAT": "ASSET-0002"},
+                "diff_write": True,
+            }
+        )
+        self.assertTrue(response["ok"])
+        self.assertLess(response["Bytes Written"], len(self.image))
+        self.assertEqual(util.FRUView.from_file(self.path)["PAT"], "ASSET-0002")
+
+    def test_modify_without_fields(self):
+        response = util.handle_request({"op": "modify", "file": str(self.path)})
+        self.assertEqual(response, {"ok": False, "error": "no modifications specified"})
+
+    def test_rebuild_returns_data(self):
+        response = util.handle_request(
+            {"op": "rebuild", "data": self.data, "fields": {"PAT": "ASSET-0002"}}
+        )
+        self.assertTrue(response["ok"])
+        view = util.FRUView(base64.b64decode(response["data"]))
+        self.assertEqual(view["PAT"], "ASSET-0002")
+        self.assertEqual(self.path.read_bytes(), self.image)
+
+    def test_get_needs_a_list(self):
+        response = util.handle_request(
+            {"op": "get", "data": self.data, "fields": "BSN"}
+        )
+        self.assertFalse(response["ok"])
+        self.assertIn("list of field names", response["error"])
+
+    def test_modify_needs_a_file(self):
+        response = util.handle_request(
+            {"op": "modify", "data": self.data, "fields": {"BSN": "SN0002"}}
+        )
+        self.assertFalse(response["ok"])
+        self.assertIn("modify needs a file", response["error"])
+
+
+    def test_file_and_data_are_exclusive(self):
+        for op in ("parse", "get", "modify", "rebuild"):
+            request = {"op": op, "file": str(self.path), "data": self.data}
+            request["fields"] = ["BSN"] if op == "get" else {"BSN": "SN0002"}
+            response = util.handle_request(request)
+            self.assertEqual(
+                response, {"ok": False, "error": "request needs either a file or data"}
+            )
+        response = util.handle_request({"op": "parse"})
+        self.assertFalse(response["ok"])
+        self.assertEqual(self.path.read_bytes(), self.image)
+
+
+class ClientTest(FRUTestCase):
+    """fruid-util.py --connect against a --serve process."""
+
+    def setUp(self):
+        super().setUp()
+        self.path = self.write("fru.bin")
+        self.socket = self.dir / "fruid.sock"
+        server = subprocess.Popen(
+            [sys.executable, str(UTIL_PATH), "--serve", str(self.socket)],
+            stderr=subprocess.DEVNULL,
+        )
+        self.addCleanup(server.wait)
+        self.addCleanup(server.terminate)
+        deadline = time.monotonic() + 10
+        while not self.socket.exists():
+            self.assertLess(time.monotonic(), deadline, "server did not start")
+            time.sleep(0.02)
+
+    def test_get_matches_a_local_read(self):
+        for args in (["-g", "BSN,PAT"], ["-g", "PAT,BCD9", "--csv"], ["-g", "BCD9"]):
+            local = run_util(self.path, *args)
+            remote = run_util(self.path, "--connect", self.socket, *args)
+            self.assertEqual(remote.returncode, 0, remote.stderr)
+            self.assertEqual(remote.stdout, local.stdout)
+
+    def test_modify(self):
+        result = run_util(self.path, "--connect", self.socket, "-m", "--BSN", "SN2")
+        self.assertEqual(result.returncode, 0, result.stderr)
+        self.assertEqual(util.FRUView.from_file(self.path)["BSN"], "SN2")
+
+    def test_other_modes_are_refused(self):
+        for args in (
+            ["--verify"],
+            ["--detail", "text"],
+            ["--scan", "1024"],
+            ["--stamp", self.dir / "out"],
+            ["--index", self.dir / "index.db"],
+            ["--cache", self.dir / "cache.db"],
+            ["--partial-read"],
+            ["-b"],
+            ["-f", self.dir / "out.xlsx"],
+        ):
+            result = run_util(self.path, "--connect", self.socket, *args)
+            self.assertEqual(result.returncode, 2, args)
+            self.assertIn("--connect cannot be combined with", result.stderr)
+        self.assertEqual(self.path.read_bytes(), self.image)
+
+    def test_no_server(self):
+        result = run_util(self.path, "--connect", self.dir / "none.sock")
+        self.assertEqual(result.returncode, 1)
+        self.assertIn("No answer from", result.stderr)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,104 @@
+import json
+import unittest
+
+from tests.common import FRUTestCase, parse_image, run_util, util
+
+
+class ManifestTest(FRUTestCase):
+    def write_manifest(self, rows):
+        path = self.dir / "manifest.jsonl"
+        path.write_text("".join(json.dumps(row) + "\n" for row in rows))
+        return util.read_manifest(path)
+
+    def test_row_is_applied(self):
+        path = self.write("a.bin")
+        (row,) = self.write_manifest([{"File": str(path), "PAT": "ASSET-0002"}])
+        record = util.manifest_record(row)
+        self.assertNotIn("Error", record)
+        self.assertEqual(util.FRUView.from_file(path)["PAT"], "ASSET-0002")
+        self.assertEqual(util.FRUView.from_file(path)["BSN"], "BSN000000000001")
+
+    def test_missing_file_is_created(self):
+        path = self.dir / "new.bin"
+        (row,) = self.write_manifest([{"File": str(path), "BSN": "SN0001"}])
+        self.assertNotIn("Error", util.manifest_record(row))
+        view = util.FRUView.from_file(path)
+        self.assertEqual(view["BSN"], "SN0001")
+        self.assertIn("BMD", view)
+
+    def test_empty_csv_cells_leave_fields_unchanged(self):
+        path = self.write("a.bin")
+        manifest = self.dir / "manifest.csv"
+        manifest.write_text(f"File,BSN,PAT\n{path},SN0002,\n")
+        (row,) = util.read_manifest(manifest)
+        self.assertEqual(row, {"File": str(path), "BSN": "SN0002", "PAT": None})
+        self.assertNotIn("Error", util.manifest_record(row))
+        view = util.FRUView.from_file(path)
+        self.assertEqual((view["BSN"], view["PAT"]), ("SN0002", "ASSET-0001"))
+
+    def test_csv_with_byte_order_mark(self):
+        path = self.write("a.bin")
+        manifest = self.dir / "manifest.csv"
+        text = f"File,BSN,PM\n{path},SN0002,Fabricant Münster\n"
+        manifest.write_bytes(text.encode("utf-8-sig"))
+        (row,) = util.read_manifest(manifest)
+        self.assertEqual(row["File"], str(path))
+        self.assertEqual(row["PM"], "Fabricant Münster")
+
+    def test_rows_are_validated(self):
+        with self.assertRaisesRegex(ValueError, "row 2 has no File"):
+            self.write_manifest([{"File": "a.bin"}, {"BSN": "SN0002"}])
+        with self.assertRaisesRegex(ValueError, "unknown field.*: NOPE"):
+            self.write_manifest([{"File": "a.bin", "NOPE": "x"}])
+
+    def test_failed_row_is_recorded(self):
+        path = self.dir / "missing" / "a.bin"
+        (row,) = self.write_manifest([{"File": str(path), "BSN": "SN0002"}])
+        record = util.manifest_record(row)
+        self.assertEqual(record["File"], str(path))
+        self.assertIn("Error", record)
+
+    def test_non_string_value_fails_the_row(self):
+        path = self.write("a.bin")
+        for value in (1234, ["01"], {"value": "x"}, True):
+            (row,) = self.write_manifest([{"File": str(path), "PAT": value}])
+            record = util.manifest_record(row)
+            self.assertIn("expected a string", record["Error"])
+        self.assertEqual(path.read_bytes(), self.image)
+
+    def test_apply_fields_leaves_fru_untouched_on_bad_value(self):
+        fru = parse_image(self.image)
+        with self.assertRaises(ValueError):
+            util.apply_fields(fru, {"BSN": "SN0002", "PAT-raw": 12})
+        self.assertEqual(fru.board_info["Board Serial"], "BSN000000000001")
+
+    def test_server_rejects_non_string_value(self):
+        path = self.write("a.bin")
+        for fields in ({"PAT": 1234}, {"PAT-raw": [1]}, ["PAT"]):
+            response = util.handle_request(
+                {"op": "modify", "file": str(path), "fields": fields}
+            )
+            self.assertFalse(response["ok"])
+        self.assertEqual(path.read_bytes(), self.image)
+
+    def test_rows_for_the_same_file_compose_in_parallel(self):
+        paths = [self.write(f"{i}.bin") for i in range(4)]
+        manifest = self.dir / "manifest.csv"
+        rows = [f"{path},SN{i},," for i, path in enumerate(paths)]
+        rows += [f"{path},,ASSET{i},PSN{i}" for i, path in enumerate(paths)]
+        rows += [f"{path},,,PSN-LAST{i}" for i, path in enumerate(paths)]
+        manifest.write_text("File,BSN,PAT,PSN\n" + "\n".join(rows) + "\n")
+
+        result = run_util("--manifest", manifest, "-j", 4)
+        self.assertEqual(result.returncode, 0, result.stderr)
+        self.assertIn("12 succeeded, 0 failed", result.stdout)
+        for i, path in enumerate(paths):
+            view = util.FRUView.from_file(path)
+            self.assertEqual(
+                (view["BSN"], view["PAT"], view["PSN"]),
+                (f"SN{i}", f"ASSET{i}", f"PSN-LAST{i}"),
+            )
+
+
+if __name__ == "__main__":
+    unittest.main()
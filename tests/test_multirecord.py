@@ -0,0 +1,98 @@
+import unittest
+
+from tests.common import FRUTestCase, parse_image, run_util, util
+
+INTERNAL_USE = b"\x01internal-use-01"  # Format version and 15 bytes of data
+
+
+def multirecord(type_id, data, end_of_list=False):
+    header = bytearray([type_id, 0x02 | (0x80 if end_of_list else 0), len(data)])
+    header.append(util.FRU.calculate_checksum(data))
+    header.append(util.FRU.calculate_checksum(header))
+    return bytes(header) + data
+
+
+RECORDS = [(0xC0, b"\x01\x02\x03\x04\x05"), (0xC2, b"power supply data")]
+MULTIRECORD = multirecord(*RECORDS[0]) + multirecord(*RECORDS[1], end_of_list=True)
+
+
+def with_extra_areas(image, multirecord_area=MULTIRECORD):
+    """Insert an Internal Use area before the info areas of image and append
+    a MultiRecord area after them, fixing up the common header."""
+    shift = len(INTERNAL_USE) // 8
+    header = [image[0], 1] + [o + shift if o else 0 for o in image[2:5]]
+    header += [(len(INTERNAL_USE) + len(image)) // 8, 0]
+    header.append(util.FRU.calculate_checksum(header))
+    return bytes(header) + INTERNAL_USE + image[8:] + multirecord_area
+
+
+class MultiRecordTest(FRUTestCase):
+    def setUp(self):
+        super().setUp()
+        self.extended = with_extra_areas(self.image)
+
+    def test_iter_multirecords(self):
+        records = list(parse_image(self.extended).iter_multirecords())
+        self.assertEqual(
+            [(r.type_id, r.format_version, r.end_of_list, r.data) for r in records],
+            [(0xC0, 2, False, RECORDS[0][1]), (0xC2, 2, True, RECORDS[1][1])],
+        )
+        mr_offset = self.extended[5] * 8
+        self.assertEqual(records[0].offset, mr_offset)
+        self.assertEqual(records[1].offset, mr_offset + 5 + len(RECORDS[0][1]))
+
+    def test_no_multirecord_area(self):
+        self.assertEqual(list(parse_image(self.image).iter_multirecords()), [])
+
+    def check_bad_area(self, area, message):
+        fru = parse_image(with_extra_areas(self.image, area))
+        with self.assertRaisesRegex(ValueError, message):
+            list(fru.iter_multirecords())
+
+    def test_bad_header_checksum(self):
+        area = bytearray(MULTIRECORD)
+        area[4] ^= 0xFF
+        self.check_bad_area(bytes(area), "header checksum")
+
+    def test_bad_data_checksum(self):
+        area = bytearray(MULTIRECORD)
+        area[5] ^= 0xFF
+        self.check_bad_area(bytes(area), "data checksum")
+
+    def test_missing_end_of_list(self):
+        self.check_bad_area(multirecord(*RECORDS[0]), "no end-of-list")
+
+    def test_areas_survive_a_length_change(self):
+        path = self.write("fru.bin", self.extended)
+        result = run_util(path, "-m", "--BSN", "A-MUCH-LONGER-BOARD-SERIAL-0001")
+        self.assertEqual(result.returncode, 0, result.stderr)
+
+        data = path.read_bytes()
+        self.assertNotEqual(len(data), len(self.extended))
+        self.assertEqual(util.FRU.calculate_checksum(data[:7]), data[7])
+        internal_use = data[1] * 8
+        self.assertEqual(internal_use, 8)
+        self.assertEqual(data[internal_use : internal_use + 16], INTERNAL_USE)
+        self.assertEqual(data[2] * 8, internal_use + 16)  # Chassis follows
+        mr_offset = data[5] * 8
+        self.assertEqual(data[mr_offset:], MULTIRECORD)
+
+        fru = parse_image(data)
+        self.assertEqual(
+            fru.board_info["Board Serial"], "A-MUCH-LONGER-BOARD-SERIAL-0001"
+        )
+        self.assertEqual(len(list(fru.iter_multirecords())), 2)
+
+    def test_rebuild_keeps_areas(self):
+        fru = parse_image(self.extended)
+        self.assertTrue(fru.rebuild_fru_binary())
+        self.assertEqual(bytes(fru.raw_data), self.extended)
+
+    def test_partial_read_follows_multirecords(self):
+        path = self.write("eeprom.bin", self.extended.ljust(4096, b"\xff"))
+        fru = parse_image(util.read_fru_file(path))
+        self.assertEqual(fru.multirecord_area(), MULTIRECORD)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,102 @@
+import asyncio
+import struct
+import threading
+import time
+import unittest
+from collections import defaultdict
+from pathlib import Path
+from unittest import mock
+
+from tests.common import FRUTestCase, util
+
+
+def collect(*args, **kwargs):
+    async def run():
+        return [item async for item in util.parse_files_async(*args, **kwargs)]
+
+    return asyncio.run(run())
+
+
+class ParseFilesAsyncTest(FRUTestCase):
+    def test_parses_every_file(self):
+        paths = [self.write(f"{i}.bin") for i in range(5)]
+        results = collect([str(self.dir)], per_bus=5)
+        self.assertEqual(sorted(path for path, _ in results), sorted(paths))
+        for _, fru in results:
+            self.assertIsInstance(fru, util.FRU)
+            self.assertEqual(fru.board_info["Board Serial"], "BSN000000000001")
+
+    def test_yields_as_completed(self):
+        slow, fast = self.write("slow.bin"), self.write("fast.bin")
+        read_fru_file = util.read_fru_file
+
+        def delayed_read(path):
+            if path == slow:
+                time.sleep(0.2)
+            return read_fru_file(path)
+
+        with mock.patch.object(util, "read_fru_file", delayed_read):
+            results = collect([slow, fast], bus_key=lambda path: path.name)
+        self.assertEqual([path for path, _ in results], [fast, slow])
+
+    def test_failures_are_yielded_with_the_exception(self):
+        good = self.write("good.bin")
+        corrupt = self.write("corrupt.bin", b"\x01")
+        missing = self.dir / "missing.bin"
+        results = dict(collect([good, corrupt, missing], per_bus=3))
+        self.assertIsInstance(results[good], util.FRU)
+        self.assertIsInstance(results[corrupt], struct.error)
+        self.assertIsInstance(results[missing], FileNotFoundError)
+
+    def test_per_bus_limits_concurrency(self):
+        paths = [self.write(f"{bus}-{i}.bin") for bus in "ab" for i in range(4)]
+        read_fru_file = util.read_fru_file
+        lock = threading.Lock()
+        active = defaultdict(int)
+        peak = defaultdict(int)
+
+        def tracked_read(path):
+            bus = path.name[0]
+            with lock:
+                active[bus] += 1
+                peak[bus] = max(peak[bus], active[bus])
+                peak["all"] = max(peak["all"], sum(active[b] for b in "ab"))
+            time.sleep(0.05)
+            with lock:
+                active[bus] -= 1
+            return read_fru_file(path)
+
+        with mock.patch.object(util, "read_fru_file", tracked_read):
+            results = collect(paths, per_bus=2, bus_key=lambda path: path.name[0])
+        self.assertEqual(len(results), len(paths))
+        self.assertEqual((peak["a"], peak["b"]), (2, 2))
+        self.assertEqual(peak["all"], 4)
+
+    def test_i2c_bus_key(self):
+        self.assertEqual(
+            util.i2c_bus_key(Path("/sys/bus/i2c/devices/12-0050/eeprom")), "i2c-12"
+        )
+        self.assertEqual(
+            util.i2c_bus_key(Path("/sys/class/i2c-adapter/i2c-3/3-0051/eeprom")),
+            "i2c-3",
+        )
+        self.assertEqual(util.i2c_bus_key(Path("/tmp/dumps/a.bin")), "/tmp/dumps")
+
+    def test_reads_only_header_and_areas(self):
+        # An EEPROM-sized file: the image followed by erased bytes.
+        path = self.write("eeprom.bin", self.image.ljust(8192, b"\xff"))
+        read_at = util.FRUAreaReader.read_at
+        with mock.patch.object(
+            util.FRUAreaReader, "read_at", autospec=True, side_effect=read_at
+        ) as spy:
+            (result,) = collect([path])
+
+        _, fru = result
+        self.assertEqual(bytes(fru.raw_data), self.image)
+        offsets = [self.image[index] * 8 for index in (2, 3, 4)]
+        area_bytes = sum(self.image[offset + 1] * 8 for offset in offsets)
+        self.assertEqual(sum(c.args[2] for c in spy.call_args_list), 8 + area_bytes)
+
+
+if __name__ == "__main__":
+    unittest.main()
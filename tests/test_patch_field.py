@@ -0,0 +1,95 @@
+import unittest
+from unittest import mock
+
+from tests.common import FRUTestCase, parse_image, util
+
+
+class UpdateBinaryTest(FRUTestCase):
+    def rebuild_spy(self):
+        rebuild = util.FRU.rebuild_fru_binary
+        return mock.patch.object(
+            util.FRU, "rebuild_fru_binary", autospec=True, side_effect=rebuild
+        )
+
+    def update(self, image, **values):
+        """Return (update_binary() image, whether it rebuilt, rebuilt image)."""
+        fru = parse_image(image)
+        for name, value in values.items():
+            fru.modify_field(name, value)
+        with self.rebuild_spy() as spy:
+            self.assertTrue(fru.update_binary())
+        self.assertEqual(fru.modified_fields, [])
+
+        expected = parse_image(image)
+        for name, value in values.items():
+            expected.modify_field(name, value)
+        self.assertTrue(expected.rebuild_fru_binary())
+        return bytes(fru.raw_data), spy.called, bytes(expected.raw_data)
+
+    def changed_offsets(self, new):
+        self.assertEqual(len(new), len(self.image))
+        return {i for i, (a, b) in enumerate(zip(self.image, new)) if a != b}
+
+    def checksum_offset(self, area):
+        offset = self.image[util.FRUView.AREA_HEADER[area]] * 8
+        return offset + self.image[offset + 1] * 8 - 1
+
+    def test_same_length_edit_is_patched(self):
+        patched, rebuilt, expected = self.update(self.image, BSN="BSN000000000002")
+        self.assertFalse(rebuilt)
+        self.assertEqual(patched, expected)
+
+        offset, length = util.FRUView(self.image).index("board")["Board Serial"]
+        changed = self.changed_offsets(patched)
+        self.assertIn(self.checksum_offset("board"), changed)
+        allowed = set(range(offset, offset + length)) | {self.checksum_offset("board")}
+        self.assertLessEqual(changed, allowed)
+        board = parse_image(patched).board_info
+        self.assertEqual(board["Board Serial"], "BSN000000000002")
+
+    def test_edits_in_several_areas(self):
+        patched, rebuilt, expected = self.update(
+            self.image, CSN="CHASSIS-SN-0002", PAT="ASSET-0002"
+        )
+        self.assertFalse(rebuilt)
+        self.assertEqual(patched, expected)
+
+    def test_mfg_date_is_patched(self):
+        patched, rebuilt, expected = self.update(self.image, BMD="2026-10-16 12:34:00")
+        self.assertFalse(rebuilt)
+        self.assertEqual(patched, expected)
+        self.assertEqual(
+            parse_image(patched).board_info["Board Mfg Date"]["date"],
+            "2026-10-16 12:34:00",
+        )
+        offset = self.image[3] * 8 + 3  # Format, length and language bytes
+        changed = self.changed_offsets(patched)
+        self.assertLessEqual(
+            changed, {offset, offset + 1, offset + 2, self.checksum_offset("board")}
+        )
+
+    def test_length_change_rebuilds(self):
+        patched, rebuilt, expected = self.update(self.image, BSN="SN2")
+        self.assertTrue(rebuilt)
+        self.assertEqual(patched, expected)
+
+    def test_field_missing_from_image_rebuilds(self):
+        self.assertNotIn("BCD7", util.FRUView(self.image))
+        patched, rebuilt, expected = self.update(self.image, BCD7="new custom")
+        self.assertTrue(rebuilt)
+        self.assertEqual(patched, expected)
+
+    def test_one_byte_value_rebuilds(self):
+        # A 1-byte field would read as 0xC1, the end-of-fields marker, so it
+        # is never patched; the rebuild then rejects it.
+        fru = parse_image(self.image)
+        fru.modify_field("PV", "B")
+        with self.rebuild_spy() as spy:
+            with self.assertLogs(util.logger, "ERROR"):
+                self.assertFalse(fru.update_binary())
+        self.assertTrue(spy.called)
+        self.assertEqual(bytes(fru.raw_data), self.image)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,38 @@
+import unittest
+
+from tests.common import FRUTestCase, run_util
+
+
+class QueryTest(FRUTestCase):
+    def setUp(self):
+        super().setUp()
+        self.paths = [self.write(name) for name in ("a.bin", "b.bin")]
+
+    def test_single_file(self):
+        for extra in ([], ["-j", "2"]):  # fast path, argparse path
+            result = run_util(self.paths[0], "-g", "BSN,PAT", *extra)
+            self.assertEqual(result.returncode, 0, result.stderr)
+            self.assertEqual(result.stdout, "BSN000000000001\tASSET-0001\n")
+
+    def test_batch_expands_directories_and_globs(self):
+        for pattern in (self.dir, self.dir / "*.bin"):
+            result = run_util("-b", pattern, "-g", "BSN", "--csv")
+            self.assertEqual(result.returncode, 0, result.stderr)
+            expected = ["File,BSN"] + [f"{p},BSN000000000001" for p in self.paths]
+            self.assertEqual(result.stdout.splitlines(), expected)
+
+    def test_single_argument_is_one_file(self):
+        # Without -b a directory or glob is not expanded into unlabeled rows
+        for pattern in (self.dir, self.dir / "*.bin"):
+            for extra in ([], ["-j", "2"], ["--csv"]):
+                result = run_util(pattern, "-g", "BSN", *extra)
+                self.assertEqual(result.returncode, 1)
+                self.assertEqual(result.stdout, "")
+                self.assertIn(str(pattern), result.stderr)
+            result = run_util(pattern, "--verify")
+            self.assertEqual(result.returncode, 1)
+            self.assertEqual(len(result.stdout.splitlines()), 1)
+
+
+if __name__ == "__main__":
+    unittest.main()
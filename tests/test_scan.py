@@ -0,0 +1,59 @@
+import unittest
+
+from tests.common import FRUTestCase, make_sample_image, util
+
+try:
+    import numpy
+except ImportError:
+    numpy = None
+
+SLOT_SIZE = 2048
+
+
+class ScanCorpusTest(FRUTestCase):
+    def setUp(self):
+        super().setUp()
+        # 26 custom fields per area: every area is longer than 255 bytes.
+        self.image = make_sample_image(26)
+        self.assertGreater(len(self.image), 1024)
+        self.corpus = self.dir / "corpus.bin"
+
+    def write_corpus(self, images):
+        with self.corpus.open("wb") as f:
+            for image in images:
+                f.write(bytes(image).ljust(SLOT_SIZE, b"\xff"))
+
+    def scan(self, use_numpy):
+        return list(util.scan_corpus(self.corpus, SLOT_SIZE, use_numpy=use_numpy))
+
+    def test_clean_corpus(self):
+        self.write_corpus([self.image] * 4)
+        self.assertEqual(self.scan(False), [])
+
+    @unittest.skipIf(numpy is None, "needs NumPy")
+    def test_numpy_matches_python(self):
+        header_bad = bytearray(self.image)
+        header_bad[7] ^= 0x01
+        board_offset = self.image[3] * 8
+        board_bad = bytearray(self.image)
+        board_bad[board_offset + 20] ^= 0x01
+        product_offset = self.image[4] * 8
+        product_long = bytearray(self.image)
+        product_long[product_offset + 1] = 0xFF
+        images = [self.image, header_bad, board_bad, self.image, product_long]
+        self.write_corpus(images)
+
+        expected = self.scan(False)
+        self.assertEqual(
+            [(result["Index"], result["Problems"]) for result in expected],
+            [
+                (1, ["header checksum"]),
+                (2, ["board checksum"]),
+                (4, ["product length"]),
+            ],
+        )
+        self.assertEqual(self.scan(True), expected)
+
+
+if __name__ == "__main__":
+    unittest.main()
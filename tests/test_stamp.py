@@ -0,0 +1,98 @@
+import unittest
+
+from tests.common import FRUTestCase, parse_image, run_util, util
+
+
+class FRUStamperTest(FRUTestCase):
+    def expected(self, values):
+        """The unit image built the slow way: modify_field + rebuild_fru_binary."""
+        fru = parse_image(self.image)
+        for name, value in values.items():
+            if value is None:
+                continue
+            if name.endswith("-raw"):
+                name, value = name[:-4], bytes(int(x, 16) for x in value.split())
+            fru.modify_field(name, value)
+        self.assertTrue(fru.rebuild_fru_binary())
+        return bytes(fru.raw_data)
+
+    def check_units(self, fields, units, rebuilt):
+        stamper = util.FRUStamper(self.image, fields)
+        for unit in units:
+            self.assertEqual(bytes(stamper.stamp(unit)), self.expected(unit), unit)
+        self.assertEqual(stamper.rebuilt, rebuilt)
+        return stamper
+
+    def test_same_length_units_are_patched(self):
+        units = [
+            {"BSN": f"BSN{n:012d}", "PSN": f"PSN{n:012d}", "PAT": f"ASSET-{n:04d}"}
+            for n in range(2, 12)
+        ]
+        self.check_units({"BSN", "PSN", "PAT"}, units, rebuilt=0)
+
+    def test_length_change_rebuilds_and_rebases(self):
+        units = [{"BSN": f"BSN{n:012d}"} for n in range(2, 5)]
+        units += [{"BSN": f"LONGER-BSN-{n:012d}"} for n in range(5, 10)]
+        units += [{"BSN": f"BSN{n:012d}"} for n in range(10, 13)]
+        # One rebuild where the length grows and one where it shrinks back;
+        # the units in between are patched against the rebuilt base.
+        self.check_units({"BSN"}, units, rebuilt=2)
+
+    def test_unset_fields_keep_the_base_values(self):
+        units = [
+            {"BSN": "BSN000000000002", "PAT": "ASSET-0002"},
+            {"BSN": "BSN000000000003", "PAT": None},
+            {"BSN": "LONGER-BSN-0004", "PAT": "LONGER-ASSET-0004"},
+            {"BSN": "LONGER-BSN-0005", "PAT": None},
+            {"BSN": None, "PAT": "LONGER-ASSET-0006"},
+        ]
+        self.check_units({"BSN", "PAT"}, units, rebuilt=3)
+
+    def test_raw_columns(self):
+        units = [
+            {"BSN-raw": "42 53 4E 2D 52 41 57"},
+            {"BSN": "BSN000000000003", "PAT-raw": "41 53 53 45 54"},
+            {"BSN": "BSN000000000004"},
+        ]
+        self.check_units({"BSN", "BSN-raw", "PAT-raw"}, units, rebuilt=2)
+
+    def test_packed_slots(self):
+        base = self.write("base.bin")
+        out = self.dir / "units.bin"
+        options = ["--slot-size", 1024, "--count", 4, "--start", 7]
+        fields = ["--BSN", "BSN{n:012d}", "--PAT", "LONG-ASSET-{n:04d}"]
+        result = run_util(base, "--stamp", out, *options, *fields)
+        self.assertEqual(result.returncode, 0, result.stderr)
+        self.assertIn("Stamped 4 images", result.stdout)
+
+        data = out.read_bytes()
+        self.assertEqual(len(data), 4 * 1024)
+        for i, n in enumerate(range(7, 11)):
+            image = self.expected({"BSN": f"BSN{n:012d}", "PAT": f"LONG-ASSET-{n:04d}"})
+            slot = data[i * 1024 : (i + 1) * 1024]
+            self.assertEqual(slot, image.ljust(1024, b"\xff"))
+        self.assertEqual(list(util.scan_corpus(out, 1024)), [])
+
+
+    def test_stamp_list_with_byte_order_mark(self):
+        base = self.write("base.bin")
+        stamp_list = self.dir / "serials.csv"
+        text = "File,BSN\nunit1.bin,BSN000000000007\nunit2.bin,SN8\n"
+        stamp_list.write_bytes(text.encode("utf-8-sig"))
+        out = self.dir / "units"
+        result = run_util(base, "--stamp", out, "--stamp-list", stamp_list)
+        self.assertEqual(result.returncode, 0, result.stderr)
+        for name, serial in (("unit1.bin", "BSN000000000007"), ("unit2.bin", "SN8")):
+            data = (out / name).read_bytes()
+            self.assertEqual(data, self.expected({"BSN": serial}))
+
+    def test_image_larger_than_slot(self):
+        out = self.dir / "units.bin"
+        stamper = util.FRUStamper(self.image, {"BSN"})
+        units = [{"BSN": "BSN000000000002"}]
+        with self.assertRaisesRegex(ValueError, "exceeds the 256-byte slot"):
+            util.write_stamped(stamper, units, out, slot_size=256)
+
+
+if __name__ == "__main__":
+    unittest.main()
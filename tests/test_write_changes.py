@@ -0,0 +1,86 @@
+import os
+import unittest
+from unittest import mock
+
+from tests.common import FRUTestCase, parse_image, util
+
+
+class DiffRangesTest(unittest.TestCase):
+    def test_identical(self):
+        self.assertEqual(util.FRU.diff_ranges(b"abcdef", b"abcdef"), [])
+
+    def test_separate_runs(self):
+        self.assertEqual(
+            util.FRU.diff_ranges(b"abcdefgh", b"aXcdYZgh"), [(1, 2), (4, 6)]
+        )
+
+    def test_change_at_both_ends(self):
+        self.assertEqual(util.FRU.diff_ranges(b"abcd", b"Xbc!"), [(0, 1), (3, 4)])
+
+    def test_new_is_longer(self):
+        self.assertEqual(util.FRU.diff_ranges(b"abc", b"abXde"), [(2, 5)])
+
+    def test_old_is_empty(self):
+        self.assertEqual(util.FRU.diff_ranges(b"", b"abc"), [(0, 3)])
+
+
+class WriteChangesTest(FRUTestCase):
+    def setUp(self):
+        super().setUp()
+        self.path = self.dir / "fru.bin"
+
+    def edited(self, **values):
+        fru = parse_image(self.image)
+        for name, value in values.items():
+            fru.modify_field(name, value)
+        self.assertTrue(fru.update_binary())
+        return fru
+
+    def test_writes_only_differing_ranges(self):
+        self.path.write_bytes(self.image)
+        fru = self.edited(BSN="BSN000000000002")
+        ranges = util.FRU.diff_ranges(self.image, fru.raw_data)
+        self.assertTrue(ranges)
+
+        with mock.patch.object(util.os, "pwrite", wraps=os.pwrite) as pwrite:
+            written = fru.write_changes(self.path)
+
+        self.assertEqual(written, sum(end - start for start, end in ranges))
+        self.assertLess(written, len(fru.raw_data))
+        self.assertEqual(
+            [(c.args[2], c.args[2] + len(c.args[1])) for c in pwrite.call_args_list],
+            ranges,
+        )
+        self.assertEqual(self.path.read_bytes(), bytes(fru.raw_data))
+
+    def test_unchanged_image_writes_nothing(self):
+        self.path.write_bytes(self.image)
+        fru = parse_image(self.image)
+        self.assertEqual(fru.write_changes(self.path), 0)
+        self.assertEqual(self.path.read_bytes(), self.image)
+
+    def test_longer_file_keeps_its_tail(self):
+        tail = bytes(range(256)) * 4
+        self.path.write_bytes(self.image + tail)
+        fru = self.edited(PAT="ASSET-0002")
+        fru.write_changes(self.path)
+        data = self.path.read_bytes()
+        self.assertEqual(len(data), len(self.image) + len(tail))
+        self.assertEqual(data[: len(fru.raw_data)], bytes(fru.raw_data))
+        self.assertEqual(data[len(fru.raw_data) :], tail)
+
+    def test_shorter_file_is_extended(self):
+        self.path.write_bytes(self.image[:16])
+        fru = parse_image(self.image)
+        written = fru.write_changes(self.path)
+        self.assertEqual(written, len(self.image) - 16)
+        self.assertEqual(self.path.read_bytes(), self.image)
+
+    def test_missing_file_is_created(self):
+        fru = parse_image(self.image)
+        self.assertEqual(fru.write_changes(self.path), len(self.image))
+        self.assertEqual(self.path.read_bytes(), self.image)
+
+
+if __name__ == "__main__":
+    unittest.main()